@@ -0,0 +1,109 @@
+"""
+Measures the memory footprint of MessageData/FieldData and the cost of building the message ID keys.
+
+The current classes are compared with a copy of the previous, dict based layout. Type, field and package names are
+sliced out of per message source text, so every message holds its own string objects just like after parsing.
+
+Run from the repository root:
+    python -m benchmarks.message_data_benchmark [--messages N] [--fields N]
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from typing import Callable, List
+
+from pytide_message_generator.dataprovider.field_data import FieldData
+from pytide_message_generator.dataprovider.message_data import MessageData
+
+FIELD_TYPES = ["bool", "int8", "uint8", "int16", "uint16", "int32", "uint32", "int64", "uint64", "float32",
+               "float64", "string", "time", "duration", "Header", "geometry_msgs/Point"]
+COMMENTS = ["", "", "", "# position in meters", "# timestamp of the measurement"]
+
+
+class LegacyFieldData:
+    def __init__(self, field_type, field_name, is_array=False, array_fixed_length=-1, max_array_size=-1,
+                 constant_value=None, comment=""):
+        self.field_type = field_type
+        self.field_name = field_name
+        self.is_array = is_array
+        self.array_fixed_length = array_fixed_length
+        self.max_array_size = max_array_size
+        self.constant_value = constant_value
+        self.comment = comment
+
+
+class LegacyMessageData:
+    def __init__(self, package, name, fields, srv_siblings=None, srv_name=None):
+        self.package = package
+        self.name = name
+        self.fields = fields
+        self.srv_siblings = srv_siblings
+        self.srv_name = srv_name
+        self.srv_index = 0
+
+    def getID(self):
+        return "/".join([*self.package, self.name])
+
+
+def buildMessages(messageClass: Callable, fieldClass: Callable, messageCount: int, fieldCount: int) -> List:
+    rng = random.Random(0)
+    messages = []
+    for i in range(messageCount):
+        fields = []
+        for j in range(fieldCount):
+            # slicing creates a new string object, the same way the parser does
+            source = "{} field_{} {}".format(rng.choice(FIELD_TYPES), j, rng.choice(COMMENTS))
+            typeEnd = source.index(" ")
+            nameEnd = source.index(" ", typeEnd + 1)
+            fields.append(fieldClass(source[:typeEnd], source[typeEnd + 1:nameEnd], comment=source[nameEnd + 1:]))
+
+        packageSource = " package_{}".format(i % 100)
+        messages.append(messageClass([packageSource[1:]], "Message{}".format(i), fields))
+    return messages
+
+
+def measureMemory(messageClass: Callable, fieldClass: Callable, messageCount: int, fieldCount: int) -> int:
+    gc.collect()
+    tracemalloc.start()
+    messages = buildMessages(messageClass, fieldClass, messageCount, fieldCount)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del messages
+    return size
+
+
+def timeKeys(messages: List, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        db = {m.getID(): m for m in messages}
+        for m in messages:
+            db[m.getID()]
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run():
+    argParser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    argParser.add_argument("--messages", type=int, default=50000)
+    argParser.add_argument("--fields", type=int, default=10)
+    args = argParser.parse_args()
+
+    legacyMemory = measureMemory(LegacyMessageData, LegacyFieldData, args.messages, args.fields)
+    memory = measureMemory(MessageData, FieldData, args.messages, args.fields)
+
+    legacyKeys = timeKeys(buildMessages(LegacyMessageData, LegacyFieldData, args.messages, args.fields))
+    keys = timeKeys(buildMessages(MessageData, FieldData, args.messages, args.fields))
+
+    print("{} messages with {} fields each".format(args.messages, args.fields))
+    print("  memory, previous layout: {:8.1f} MiB".format(legacyMemory / 2 ** 20))
+    print("  memory, slots + interning: {:6.1f} MiB ({:.0%} less)".format(memory / 2 ** 20,
+                                                                       1 - memory / legacyMemory))
+    print("  message DB build + lookup, previous: {:7.3f}s".format(legacyKeys))
+    print("  message DB build + lookup, cached ID: {:6.3f}s ({:.1f}x)".format(keys, legacyKeys / keys))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,142 @@
+"""
+Times every phase of the generation pipeline on synthetic corpora of increasing size.
+
+For each size a corpus is generated, written out as *.msg/*.srv files and then run through file discovery, parsing,
+type resolution, rendering with the pytide and riptide generators and writing of the generated files.
+
+Run from the repository root:
+    python -m benchmarks.pipeline_benchmark [--sizes 1000 10000 50000] [--packages N] [--seed N] [--workers N]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+sys.path.append('plugins/')
+
+from _dummy_data_provider.synthetic_corpus import SyntheticCorpus
+from message_file_input.file_discovery import iterMessageFiles
+from message_file_input.ros1msg.ros1parser import Ros1Parser
+from msgfile_generator.ros1msg.ros1gen import Ros1Gen
+from pytide_generator.pytide_gen.generator import CodeGenerator as PytideCodeGenerator
+from riptide_generator_unity.riptide_gen.generator import CodeGenerator as RiptideCodeGenerator
+
+PHASES = ["discovery", "parse", "type resolution", "pytide render", "riptide render", "write files"]
+
+PYTIDE_SETTINGS = {
+    "base_package": "ros_messages",
+    "generation_mode": 0,
+    "flatten_structure": False,
+    "common_super_class": False,
+    "super_class_name": "",
+    "super_class_package": "",
+}
+
+RIPTIDE_SETTINGS = {
+    "namespace": "Ros.Msgs",
+    "generation_mode": 0,
+    "flatten_structure": False,
+    "partial_class": True,
+    "common_base": False,
+    "common_base_namespace": "",
+    "common_base_class": "",
+}
+
+
+class PhaseTimer:
+
+    def __init__(self):
+        self.times: Dict[str, float] = {}
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        # the pipeline reports every file it touches
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+        self.times[name] = self.times.get(name, 0.0) + time.perf_counter() - start
+
+
+def writeCorpus(path: str, size: int, packages: int, seed: int):
+    messages = SyntheticCorpus(packages=packages, messages=size, seed=seed).generate()
+
+    writer = Ros1Gen()
+    messageDB = {m.getID(): m for m in messages}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for message in messages:
+            writer.generateFile(message, messageDB, {})
+        writer.writeOutFiles(path)
+
+
+def extractType(path: str) -> Tuple[str, str, str]:
+    parts = path.split('/')
+    return parts[-3], parts[-1].rsplit('.', 1)[0], path
+
+
+def runPipeline(inputPath: str, outputPath: str, timer: PhaseTimer, workers: int = 1) -> int:
+    with timer.phase("discovery"):
+        types = [extractType(path) for path in iterMessageFiles(inputPath)]
+
+    parser = Ros1Parser()
+    with timer.phase("parse"):
+        messages = []
+        for t in types:
+            messages.extend(parser.parseFile(*t))
+
+    with timer.phase("type resolution"):
+        parser.buildTypeChecks(types)
+        issues = parser.validateTypes(messages)
+        messageDB = {m.getID(): m for m in messages}
+
+    if len(issues) > 0:
+        raise RuntimeError("Synthetic corpus has unresolved types:\n" + "\n".join(issues[:10]))
+
+    pytide = PytideCodeGenerator(os.path.abspath('plugins/pytide_generator'))
+    with timer.phase("pytide render"):
+        pytide.generateFiles(messages, messageDB, PYTIDE_SETTINGS, workers)
+
+    riptide = RiptideCodeGenerator(os.path.abspath('plugins/riptide_generator_unity'))
+    with timer.phase("riptide render"):
+        riptide.generateFiles(messages, messageDB, RIPTIDE_SETTINGS, workers)
+
+    with timer.phase("write files"):
+        pytide.writeOutFiles(outputPath, PYTIDE_SETTINGS)
+        riptide.writeOutFiles(outputPath, RIPTIDE_SETTINGS)
+
+    return len(messages)
+
+
+def run():
+    argParser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    argParser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    argParser.add_argument("--packages", type=int, default=50)
+    argParser.add_argument("--seed", type=int, default=0)
+    argParser.add_argument("--workers", type=int, default=1, help="worker processes rendering in parallel")
+    args = argParser.parse_args()
+
+    results: List[Tuple[int, int, PhaseTimer]] = []
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as path:
+            inputPath = os.path.join(path, "input")
+            writeCorpus(inputPath, size, args.packages, args.seed)
+
+            timer = PhaseTimer()
+            messageCount = runPipeline(inputPath, os.path.join(path, "output"), timer, args.workers)
+            results.append((size, messageCount, timer))
+
+        print("{:>8} messages: {:8.3f}s".format(size, sum(timer.times.values())), flush=True)
+
+    print()
+    print("{:<16}".format("phase") + "".join("{:>12}".format(size) for size, _, _ in results))
+    for phase in PHASES:
+        print("{:<16}".format(phase) + "".join("{:>11.3f}s".format(timer.times[phase]) for _, _, timer in results))
+    print("{:<16}".format("total") + "".join("{:>11.3f}s".format(sum(timer.times.values()))
+                                             for _, _, timer in results))
+
+
+if __name__ == "__main__":
+    run()
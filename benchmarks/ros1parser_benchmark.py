@@ -0,0 +1,89 @@
+"""
+Compares the regex fast path of Ros1Parser.parseField with the character based parser on a synthetic corpus.
+
+Run from the repository root:
+    python -m benchmarks.ros1parser_benchmark [--messages N] [--repeat N]
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import List, Tuple
+
+sys.path.append('plugins/')
+
+from message_file_input.ros1msg.ros1parser import Ros1Parser
+
+FIELD_TYPES = ["bool", "int8", "uint8", "int16", "uint16", "int32", "uint32", "int64", "uint64", "float32",
+               "float64", "string", "time", "duration", "Header", "geometry_msgs/Point"]
+CONSTANT_VALUES = {"int32": "-42", "uint8": "7", "float64": "1.5e-3", "string": "some text", "bool": "true"}
+
+
+def generateMessageSource(rng: random.Random, fieldCount: int) -> str:
+    lines = []
+    for i in range(fieldCount):
+        roll = rng.random()
+        if roll < 0.1:
+            lines.append("# Documentation for field {}".format(i))
+        if roll < 0.15:
+            constantType = rng.choice(list(CONSTANT_VALUES))
+            lines.append("{} CONSTANT_{} = {}".format(constantType, i, CONSTANT_VALUES[constantType]))
+            continue
+
+        array = rng.choice(["", "", "", "[]", "[9]"])
+        comment = "  # trailing comment" if rng.random() < 0.2 else ""
+        lines.append("{}{} field_{}{}".format(rng.choice(FIELD_TYPES), array, i, comment))
+    return "\n".join(lines) + "\n"
+
+
+def writeCorpus(path: str, messageCount: int, seed: int = 0) -> List[Tuple[str, str, str]]:
+    rng = random.Random(seed)
+    types = []
+    for i in range(messageCount):
+        package = "package_{}".format(i % 50)
+        directory = os.path.join(path, package, "msgs")
+        os.makedirs(directory, exist_ok=True)
+
+        filename = os.path.join(directory, "Message{}.msg".format(i))
+        with open(filename, "w") as f:
+            f.write(generateMessageSource(rng, rng.randrange(1, 25)))
+        types.append((package, "Message{}".format(i), filename))
+    return types
+
+
+def timeParser(types: List[Tuple[str, str, str]], fastPath: bool, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        parser = Ros1Parser(fastPath=fastPath)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for t in types:
+                parser.parseMessage(*t)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run():
+    argParser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    argParser.add_argument("--messages", type=int, default=5000)
+    argParser.add_argument("--repeat", type=int, default=3)
+    args = argParser.parse_args()
+
+    with tempfile.TemporaryDirectory() as path:
+        types = writeCorpus(path, args.messages)
+
+        slow = timeParser(types, False, args.repeat)
+        fast = timeParser(types, True, args.repeat)
+
+    print("Parsed {} messages (best of {})".format(args.messages, args.repeat))
+    print("  character parser: {:8.3f}s".format(slow))
+    print("  regex fast path:  {:8.3f}s".format(fast))
+    print("  speedup:          {:8.2f}x".format(slow / fast))
+
+
+if __name__ == "__main__":
+    run()
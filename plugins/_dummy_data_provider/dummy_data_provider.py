@@ -5,6 +5,7 @@ from PyQt6.QtWidgets import QWidget
 
 from pytide_message_generator.dataprovider.field_data import FieldData
 from .dummy_settings_widget import DummySettingsWidget
+from .synthetic_corpus import SyntheticCorpus
 from pytide_message_generator.dataprovider.idataprovider import IDataProvider
 from pytide_message_generator.dataprovider.message_data import MessageData
 
@@ -46,8 +47,27 @@ class DummyDataProvider(IDataProvider):
         """
         return self.settingsWidget
 
-    def loadMessagesFromWidgetSettings(self, settings: QWidget) -> List[MessageData]:
-        return self.messages
+    def getSettingsDict(self, settings: DummySettingsWidget) -> Dict:
+        return {
+            "synthetic": settings.synthetic_check.isChecked(),
+            "packages": settings.packages_spin.value(),
+            "messages": settings.messages_spin.value(),
+            "nesting_depth": settings.nesting_depth_spin.value(),
+            "array_ratio": settings.array_ratio_spin.value(),
+            "service_share": settings.service_share_spin.value(),
+            "seed": settings.seed_spin.value(),
+        }
+
+    def loadMessagesFromWidgetSettings(self, settings: DummySettingsWidget) -> List[MessageData]:
+        return self.loadMessagesFromDictSettings(self.getSettingsDict(settings))
 
     def loadMessagesFromDictSettings(self, settings: Dict) -> List[MessageData]:
-        return self.messages
\ No newline at end of file
+        if not settings.get('synthetic', False):
+            return self.messages
+
+        return SyntheticCorpus(packages=settings.get('packages', 10), messages=settings.get('messages', 100),
+                               minFields=settings.get('min_fields', 1), maxFields=settings.get('max_fields', 20),
+                               fieldMix=settings.get('field_mix'), nestingDepth=settings.get('nesting_depth', 3),
+                               arrayRatio=settings.get('array_ratio', 0.2),
+                               fixedArrayRatio=settings.get('fixed_array_ratio', 0.3),
+                               serviceShare=settings.get('service_share', 0.1), seed=settings.get('seed', 0)).generate()
\ No newline at end of file
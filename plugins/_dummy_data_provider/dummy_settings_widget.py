@@ -1,7 +1,18 @@
-from PyQt6.QtWidgets import QWidget
+from PyQt6 import uic
+from PyQt6.QtWidgets import QWidget, QCheckBox, QSpinBox, QDoubleSpinBox
 
 
 class DummySettingsWidget(QWidget):
 
     def __init__(self, base_path: str, parent: QWidget = None):
         super(DummySettingsWidget, self).__init__(parent=parent)
+
+        self.synthetic_check: QCheckBox = None
+        self.packages_spin: QSpinBox = None
+        self.messages_spin: QSpinBox = None
+        self.nesting_depth_spin: QSpinBox = None
+        self.array_ratio_spin: QDoubleSpinBox = None
+        self.service_share_spin: QDoubleSpinBox = None
+        self.seed_spin: QSpinBox = None
+
+        uic.loadUi(base_path + '/resources/gui/settingsWidget.ui', self)
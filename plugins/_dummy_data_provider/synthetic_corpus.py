@@ -0,0 +1,162 @@
+import random
+from typing import Dict, List, Optional
+
+from pytide_message_generator.dataprovider.field_data import FieldData
+from pytide_message_generator.dataprovider.message_data import MessageData
+
+INTEGER_TYPES = ["int8", "uint8", "int16", "uint16", "int32", "uint32", "int64", "uint64"]
+FLOAT_TYPES = ["float32", "float64"]
+TIME_TYPES = ["time", "duration"]
+
+# Relative weights of the field categories, 'message' fields are only used where a nested message is available
+DEFAULT_FIELD_MIX: Dict[str, float] = {
+    "integer": 4,
+    "float": 3,
+    "bool": 1,
+    "string": 1,
+    "time": 0.5,
+    "message": 2,
+    "constant": 0.5,
+}
+
+
+class SyntheticCorpus:
+    """
+    Generates a reproducible corpus of messages and services for benchmarks and for trying out generators.
+
+    Every message is assigned a nesting level. Messages of level 0 only have primitive fields, messages of a higher
+    level reference at least one message of the level below, so the deepest messages nest exactly nestingDepth levels
+    and the corpus is free of cycles. Nested types of the same package are referenced by name, all others by their
+    full type name.
+    """
+
+    def __init__(self, packages: int = 10, messages: int = 100, minFields: int = 1, maxFields: int = 20,
+                 fieldMix: Optional[Dict[str, float]] = None, nestingDepth: int = 3, arrayRatio: float = 0.2,
+                 fixedArrayRatio: float = 0.3, serviceShare: float = 0.1, seed: int = 0):
+        """
+        :param packages: number of packages the messages are spread over
+        :param messages: number of messages, a service counts as its request and response message
+        :param minFields: minimal number of fields per message
+        :param maxFields: maximal number of fields per message
+        :param fieldMix: relative weights of the field categories, see DEFAULT_FIELD_MIX
+        :param nestingDepth: maximal nesting depth of message fields
+        :param arrayRatio: share of the non constant fields that are arrays
+        :param fixedArrayRatio: share of the arrays that have a fixed length
+        :param serviceShare: share of the messages that are part of a service
+        :param seed: seed of the random number generator
+        """
+        self.packages: int = max(1, packages)
+        self.messages: int = messages
+        self.minFields: int = minFields
+        self.maxFields: int = max(minFields, maxFields)
+        self.fieldMix: Dict[str, float] = dict(DEFAULT_FIELD_MIX if fieldMix is None else fieldMix)
+        self.nestingDepth: int = max(0, nestingDepth)
+        self.arrayRatio: float = arrayRatio
+        self.fixedArrayRatio: float = fixedArrayRatio
+        self.serviceShare: float = serviceShare
+        self.seed: int = seed
+
+    def generate(self) -> List[MessageData]:
+        """
+        :return: all messages of the corpus, messages of a lower nesting level first
+        """
+        rng = random.Random(self.seed)
+
+        serviceCount = int(self.messages * self.serviceShare) // 2
+        messageCount = self.messages - 2 * serviceCount
+
+        # Nested messages per level, services are never nested
+        levels: List[List[MessageData]] = [[] for _ in range(self.nestingDepth + 1)]
+        result: List[MessageData] = []
+
+        for i in range(messageCount):
+            level = i * (self.nestingDepth + 1) // max(1, messageCount)
+            package = "synthetic_pkg_{}".format(i % self.packages)
+            message = MessageData([package], "Message{}".format(i), self.generateFields(rng, package, levels, level))
+            levels[level].append(message)
+            result.append(message)
+
+        for i in range(serviceCount):
+            package = "synthetic_pkg_{}".format(i % self.packages)
+            name = "Service{}".format(i)
+            request = MessageData([package], "{}Request".format(name),
+                                  self.generateFields(rng, package, levels, self.nestingDepth + 1))
+            response = MessageData([package], "{}Response".format(name),
+                                   self.generateFields(rng, package, levels, self.nestingDepth + 1))
+
+            request.srv_siblings = [response]
+            request.srv_name = name
+            request.srv_index = 0
+
+            response.srv_siblings = [request]
+            response.srv_name = name
+            response.srv_index = 1
+
+            result.extend([request, response])
+
+        return result
+
+    def generateFields(self, rng: random.Random, package: str, levels: List[List[MessageData]],
+                       level: int) -> List[FieldData]:
+        categories = [c for c in self.fieldMix if c != "message" or level > 0]
+        weights = [self.fieldMix[c] for c in categories]
+
+        fields = []
+        for i in range(rng.randint(self.minFields, self.maxFields)):
+            if level > 0 and i == 0 and level <= self.nestingDepth:
+                # guarantees the nesting depth of the level
+                fields.append(self.generateMessageField(rng, package, levels[level - 1], i))
+                continue
+
+            category = rng.choices(categories, weights)[0] if len(categories) > 0 else "integer"
+            if category == "message":
+                candidates = levels[rng.randrange(min(level, self.nestingDepth + 1))]
+                if len(candidates) > 0:
+                    fields.append(self.generateMessageField(rng, package, candidates, i))
+                    continue
+                category = "integer"
+
+            if category == "constant":
+                fields.append(self.generateConstant(rng, i))
+            else:
+                fields.append(self.makeArray(rng, FieldData(self.pickPrimitive(rng, category), "field_{}".format(i))))
+        return fields
+
+    def generateMessageField(self, rng: random.Random, package: str, candidates: List[MessageData],
+                             index: int) -> FieldData:
+        if len(candidates) == 0:
+            return FieldData("int32", "field_{}".format(index))
+
+        nested = rng.choice(candidates)
+        nestedPackage = "/".join(nested.package)
+        fieldType = nested.name if nestedPackage == package else nested.getID()
+        return self.makeArray(rng, FieldData(fieldType, "nested_{}".format(index)))
+
+    def generateConstant(self, rng: random.Random, index: int) -> FieldData:
+        name = "CONSTANT_{}".format(index)
+        roll = rng.randrange(4)
+        if roll == 0:
+            return FieldData("int32", name, constant_value=rng.randint(-1000, 1000))
+        if roll == 1:
+            return FieldData("float64", name, constant_value=rng.randint(-1000, 1000) / 8)
+        if roll == 2:
+            return FieldData("bool", name, constant_value=rng.random() < 0.5)
+        return FieldData("string", name, constant_value="value_{}".format(index))
+
+    def pickPrimitive(self, rng: random.Random, category: str) -> str:
+        if category == "integer":
+            return rng.choice(INTEGER_TYPES)
+        if category == "float":
+            return rng.choice(FLOAT_TYPES)
+        if category == "time":
+            return rng.choice(TIME_TYPES)
+        if category == "bool":
+            return "bool"
+        return "string"
+
+    def makeArray(self, rng: random.Random, field: FieldData) -> FieldData:
+        if rng.random() < self.arrayRatio:
+            field.is_array = True
+            if rng.random() < self.fixedArrayRatio:
+                field.array_fixed_length = rng.randint(1, 16)
+        return field
@@ -0,0 +1,85 @@
+import os
+from fnmatch import fnmatch
+from typing import Iterator, Optional, Sequence, Set, FrozenSet
+
+# Directories of build systems, version control and tooling that never hold message definitions of interest
+SKIPPED_DIRECTORIES: FrozenSet[str] = frozenset([
+    '.git', '.hg', '.svn', '.idea', '.vscode', '.venv', 'venv', '__pycache__', '.catkin_tools',
+    'build', 'devel', 'install', 'log', 'logs', 'node_modules',
+])
+
+# Folder a message file has to be in -> expected extension
+MESSAGE_FILE_FOLDERS = {
+    'msgs': '.msg',
+    'srvs': '.srv',
+}
+
+
+def matchesAny(relativePath: str, name: str, patterns: Sequence[str]) -> bool:
+    for pattern in patterns:
+        if fnmatch(relativePath, pattern) or fnmatch(name, pattern):
+            return True
+    return False
+
+
+def iterMessageFiles(root: str, include: Optional[Sequence[str]] = None, exclude: Optional[Sequence[str]] = None,
+                     skipDirectories: FrozenSet[str] = SKIPPED_DIRECTORIES) -> Iterator[str]:
+    """
+    Walks the directory tree below root and yields all message file candidates, i.e. '[package]/msgs/[name].msg'
+    and '[package]/srvs/[name].srv'. The walk is iterative, uses the cached types of os.scandir entries and visits
+    the entries of each directory in sorted order.
+
+    :param root: directory to search
+    :param include: glob patterns, if given only files whose path relative to root (or name) matches one are yielded
+    :param exclude: glob patterns for files and directories (relative path or name) to leave out
+    :param skipDirectories: names of directories that are never entered
+    :return: the paths of all message file candidates, joined with '/'
+    """
+    include = list(include) if include else []
+    exclude = list(exclude) if exclude else []
+
+    realRoot = os.path.realpath(root)
+    visited: Set[str] = set()
+    stack = [(root.rstrip('/\\') or root, '')]
+
+    while len(stack) > 0:
+        path, relativePath = stack.pop()
+
+        try:
+            with os.scandir(path) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError as ex:
+            print("Skipping unreadable directory '{}': {}".format(path, ex))
+            continue
+
+        extension = MESSAGE_FILE_FOLDERS.get(os.path.basename(path))
+
+        directories = []
+        for entry in entries:
+            childPath = path + '/' + entry.name
+            childRelativePath = relativePath + '/' + entry.name if relativePath else entry.name
+
+            if extension is not None and entry.name.endswith(extension):
+                if not entry.is_file():
+                    continue
+                if include and not matchesAny(childRelativePath, entry.name, include):
+                    continue
+                if exclude and matchesAny(childRelativePath, entry.name, exclude):
+                    continue
+                yield childPath
+
+            elif entry.is_dir():
+                if entry.name in skipDirectories:
+                    continue
+                if exclude and matchesAny(childRelativePath, entry.name, exclude):
+                    continue
+                if entry.is_symlink():
+                    # links into the tree itself would yield duplicates or loop forever
+                    target = os.path.realpath(childPath)
+                    if target == realRoot or target.startswith(realRoot + os.sep) or target in visited:
+                        continue
+                    visited.add(target)
+                directories.append((childPath, childRelativePath))
+
+        # depth first, in sorted order
+        stack.extend(reversed(directories))
@@ -1,14 +1,16 @@
-from os import listdir
-from os.path import isfile, isdir
+from os.path import isdir
 from pathlib import Path
-from typing import Union, Dict, Any, List
+from typing import Union, Dict, Any, List, Optional, Iterator, Tuple
 
 from PyQt6.QtWidgets import QWidget
 
+from .file_discovery import iterMessageFiles
 from .msgfile_settings_widget import MsgFileSettingsWidget
+from .parse_cache import ParseCache, getDefaultCachePath
 from pytide_message_generator.dataprovider.idataprovider import IDataProvider
 from pytide_message_generator.dataprovider.message_data import MessageData
-from .ros1msg.ros1parser import Ros1Parser
+from .ros1msg.parallel_parser import parseFilesParallel
+from .ros1msg.ros1parser import Ros1Parser, ROS1_PARSER_VERSION, UnresolvedTypesException
 
 
 class MessageFileDataProvider(IDataProvider):
@@ -34,14 +36,27 @@ class MessageFileDataProvider(IDataProvider):
         """
         return self.settingsWidget
 
-    def loadMessagesFromWidgetSettings(self, settings: MsgFileSettingsWidget) -> List[MessageData]:
-        return self.loadMessagesFromDictSettings({
+    def getSettingsDict(self, settings: MsgFileSettingsWidget) -> Dict:
+        return {
             "path": settings.dir_line_edit.text(),
-        })
+            "use_cache": settings.use_cache_check.isChecked(),
+            "parallel": settings.parallel_check.isChecked(),
+            "exclude": settings.exclude_line_edit.text(),
+            "strict_types": settings.strict_types_check.isChecked(),
+        }
+
+    def loadMessagesFromWidgetSettings(self, settings: MsgFileSettingsWidget) -> List[MessageData]:
+        return self.loadMessagesFromDictSettings(self.getSettingsDict(settings))
 
     def loadMessagesFromDictSettings(self, settings: Dict) -> List[MessageData]:
+        return list(self.iterMessagesFromDictSettings(settings))
+
+    def iterMessagesFromWidgetSettings(self, settings: MsgFileSettingsWidget) -> Iterator[MessageData]:
+        return self.iterMessagesFromDictSettings(self.getSettingsDict(settings))
+
+    def iterMessagesFromDictSettings(self, settings: Dict) -> Iterator[MessageData]:
         if not isdir(settings['path']):
-            return []
+            return
 
         print("Loading Messages from Path: '{}'".format(settings['path']))
         fileNames = self.listAllFiles(settings['path'], settings)
@@ -50,25 +65,80 @@ class MessageFileDataProvider(IDataProvider):
 
         types = []
         for filename in fileNames:
-            types.append(self.extractTypes(filename))
+            t = self.extractTypes(filename)
+            if t is not None:
+                types.append(t)
 
         parser.buildTypeChecks(types)
+        messages = self.parseFiles(parser, types, settings)
+
+        if settings.get('strict_types', False):
+            # Fail before the first message is handed out
+            messages = list(messages)
+            issues = parser.validateTypes(messages)
+            if len(issues) > 0:
+                raise UnresolvedTypesException(issues)
+            yield from messages
+            return
+
+        issueCount = 0
+        for message in messages:
+            for issue in parser.validateMessage(message):
+                print(issue)
+                issueCount += 1
+            yield message
+
+        if issueCount > 0:
+            print("Found {} unresolved or ambiguous field types".format(issueCount))
+
+    def parseFiles(self, parser: Ros1Parser, types: List[Tuple[str, str, str]], settings: Dict) -> Iterator[MessageData]:
+        """
+        Parses the given files, or loads them from the parse cache
 
-        messages = []
-
-        for t in types:
-            if t[2].endswith('.msg'):
-                #try:
-                messages.append(parser.parseMessage(*t))
-                #except Exception as ex:
-                #    print(ex)
-            if t[2].endswith('.srv'):
-                #try:
-                #    print(" ".join(t))
-                messages.extend(parser.parseService(*t))
-                #except Exception as ex:
-                #    print(ex)
-        return messages
+        :param parser: parser with the type table of all files
+        :param types: (package, name, path) of the files to load
+        :return: the messages of all files, in the order of types
+        """
+        cache = self.openCache(settings)
+
+        if cache is not None:
+            cached = [cache.lookup(t[2]) for t in types]
+        else:
+            cached = [None] * len(types)
+        pending = [t for t, parsed in zip(types, cached) if parsed is None]
+
+        if settings.get('parallel', False) and len(pending) > 1:
+            parsedFiles = parseFilesParallel(types, pending, settings.get('workers'))
+        else:
+            parsedFiles = (parser.parseFile(*t) for t in pending)
+
+        try:
+            for t, parsed in zip(types, cached):
+                if parsed is None:
+                    parsed = next(parsedFiles)
+                    if cache is not None:
+                        cache.store(t[2], parsed)
+
+                yield from parsed
+        finally:
+            if cache is not None:
+                print("Loaded {} of {} files from the parse cache".format(cache.hits, cache.hits + cache.misses))
+                cache.save()
+
+    def openCache(self, settings: Dict) -> Optional[ParseCache]:
+        """
+        :return: the parse cache configured in the settings, or None if caching is disabled
+        """
+        if not settings.get('use_cache', False):
+            return None
+
+        cachePath = settings.get('cache_path')
+        if cachePath is None or cachePath == '':
+            cachePath = getDefaultCachePath(settings['path'])
+
+        cache = ParseCache(cachePath, ROS1_PARSER_VERSION)
+        cache.load()
+        return cache
 
     def extractTypes(self, filename: str):
         file = filename.split('/')
@@ -81,13 +151,15 @@ class MessageFileDataProvider(IDataProvider):
             return (pkg_name, msg_name, filename)
 
     def listAllFiles(self, path, settings: Dict):
-        data = []
-        for f in listdir(path):
-            if isfile(path + "/" + f):
-                data.append(path + "/" + f)
-
-            if isdir(path + "/" + f):
-                data.extend(self.listAllFiles(path + "/" + f, settings))
-
-        return data
+        return list(iterMessageFiles(path, self.getPatterns(settings, 'include'), self.getPatterns(settings, 'exclude')))
 
+    def getPatterns(self, settings: Dict, key: str) -> List[str]:
+        """
+        :return: the glob patterns stored under key, given either as list or as comma separated string
+        """
+        patterns = settings.get(key)
+        if patterns is None:
+            return []
+        if isinstance(patterns, str):
+            patterns = patterns.split(',')
+        return [pattern.strip() for pattern in patterns if pattern.strip() != '']
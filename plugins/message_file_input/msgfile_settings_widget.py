@@ -1,5 +1,5 @@
 from PyQt6 import uic
-from PyQt6.QtWidgets import QWidget, QLineEdit, QToolButton
+from PyQt6.QtWidgets import QWidget, QLineEdit, QToolButton, QCheckBox
 
 from pytide_message_generator.tools.ui_interaction_tools import setup_folder_select
 
@@ -11,6 +11,10 @@ class MsgFileSettingsWidget(QWidget):
 
         self.dir_line_edit: QLineEdit = None
         self.dir_change_btn: QToolButton = None
+        self.use_cache_check: QCheckBox = None
+        self.parallel_check: QCheckBox = None
+        self.exclude_line_edit: QLineEdit = None
+        self.strict_types_check: QCheckBox = None
 
         uic.loadUi(base_path + '/resources/gui/settingsWidget.ui', self)
 
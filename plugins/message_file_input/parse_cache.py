@@ -0,0 +1,154 @@
+import hashlib
+import os
+import pickle
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from pytide_message_generator.dataprovider.message_data import MessageData
+
+# Bump whenever the layout of the cache file or of the cached classes changes
+CACHE_FORMAT_VERSION = 3
+
+CACHE_FILE_EXTENSION = ".msgcache"
+
+
+def getDefaultCacheDirectory() -> str:
+    """
+    :return: the per user cache directory of the message generator
+    """
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), "AppData", "Local")
+    elif sys.platform == "darwin":
+        base = os.path.join(os.path.expanduser("~"), "Library", "Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+
+    return os.path.join(base, "RosbridgeMessageGenerator")
+
+
+def getDefaultCachePath(inputRoot: str) -> str:
+    """
+    :param inputRoot: the directory the message files are loaded from
+    :return: the path of the cache file for the given input directory inside the user cache directory
+    """
+    rootID = hashlib.sha1(os.path.abspath(inputRoot).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(getDefaultCacheDirectory(), rootID + CACHE_FILE_EXTENSION)
+
+
+class ParseCache:
+    """
+    Persistent cache of parsed message files.
+
+    Entries are stored per file path together with the mtime, size and content hash of the parsed file. A file whose
+    mtime and size are unchanged is served without reading it, a file with the same size but a new mtime is read and
+    hashed, and any other change invalidates only that file's entry. The whole cache is dropped if it was written by
+    another parser version.
+    """
+
+    def __init__(self, cachePath: str, parserVersion: int):
+        self.cachePath: str = cachePath
+        self.parserVersion: int = parserVersion
+
+        # path -> (mtime_ns, size, sha1 digest, parsed messages)
+        self.entries: Dict[str, Tuple[int, int, bytes, List[MessageData]]] = {}
+        self.pendingStats: Dict[str, os.stat_result] = {}
+        self.usedPaths = set()
+        self.dirty: bool = False
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def load(self):
+        try:
+            with open(self.cachePath, "rb") as f:
+                formatVersion, parserVersion, entries = pickle.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as ex:
+            print("Ignoring unreadable parse cache '{}': {}".format(self.cachePath, ex))
+            return
+
+        if formatVersion != CACHE_FORMAT_VERSION or parserVersion != self.parserVersion:
+            return
+
+        self.entries = entries
+
+    def lookup(self, path: str) -> Optional[List[MessageData]]:
+        """
+        :param path: path of the message file
+        :return: the cached messages of the file, or None if the file is not cached or changed since
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        self.usedPaths.add(path)
+        entry = self.entries.get(path)
+        if entry is not None:
+            mtime, size, digest, messages = entry
+            if mtime == stat.st_mtime_ns and size == stat.st_size:
+                self.hits += 1
+                return messages
+            if size == stat.st_size and self.hashFile(path) == digest:
+                # touched, but unchanged
+                self.entries[path] = (stat.st_mtime_ns, size, digest, messages)
+                self.dirty = True
+                self.hits += 1
+                return messages
+
+        self.misses += 1
+        self.pendingStats[path] = stat
+        return None
+
+    def store(self, path: str, messages: List[MessageData]):
+        """
+        Stores the parse result of a file that missed the cache in lookup
+        """
+        before = self.pendingStats.pop(path, None)
+        if before is None:
+            return
+
+        digest = self.hashFile(path)
+        after = os.stat(path)
+        if after.st_mtime_ns != before.st_mtime_ns or after.st_size != before.st_size:
+            # modified while parsing, the result might not match the hashed content
+            return
+
+        self.usedPaths.add(path)
+        self.entries[path] = (after.st_mtime_ns, after.st_size, digest, messages)
+        self.dirty = True
+
+    def save(self):
+        """
+        Writes the cache, dropping the entries of files that were not part of this load
+        """
+        stale = [path for path in self.entries if path not in self.usedPaths]
+        for path in stale:
+            del self.entries[path]
+
+        if not self.dirty and len(stale) == 0:
+            return
+
+        directory = os.path.dirname(self.cachePath)
+        if len(directory) > 0:
+            os.makedirs(directory, exist_ok=True)
+
+        tempPath = "{}.{}.tmp".format(self.cachePath, os.getpid())
+        try:
+            with open(tempPath, "wb") as f:
+                pickle.dump((CACHE_FORMAT_VERSION, self.parserVersion, self.entries), f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tempPath, self.cachePath)
+        except OSError as ex:
+            print("Could not write parse cache '{}': {}".format(self.cachePath, ex))
+            if os.path.exists(tempPath):
+                os.remove(tempPath)
+            return
+
+        self.dirty = False
+
+    @staticmethod
+    def hashFile(path: str) -> bytes:
+        with open(path, "rb") as f:
+            return hashlib.sha1(f.read()).digest()
@@ -0,0 +1,54 @@
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple, Optional, Iterator
+
+from pytide_message_generator.dataprovider.message_data import MessageData
+from .ros1parser import Ros1Parser
+
+# Chunks per worker, more chunks balance uneven file sizes better, fewer chunks reduce the IPC overhead
+CHUNKS_PER_WORKER = 4
+
+# Parser of the current worker process, set up once by initializeWorker
+_WORKER_PARSER: Optional[Ros1Parser] = None
+
+
+def initializeWorker(types: List[Tuple[str, str, str]]):
+    """
+    Sets up the parser of a worker process, the type table is transferred once per worker
+    """
+    global _WORKER_PARSER
+    _WORKER_PARSER = Ros1Parser()
+    _WORKER_PARSER.buildTypeChecks(types)
+
+
+def parseChunk(chunk: List[Tuple[str, str, str]]) -> List[List[MessageData]]:
+    return [_WORKER_PARSER.parseFile(*t) for t in chunk]
+
+
+def parseFilesParallel(types: List[Tuple[str, str, str]], files: List[Tuple[str, str, str]],
+                       workers: Optional[int] = None) -> Iterator[List[MessageData]]:
+    """
+    Parses the given files on a process pool
+
+    :param types: the complete type table, see Ros1Parser.buildTypeChecks
+    :param files: (package, name, path) of the files to parse
+    :param workers: number of worker processes, defaults to the number of CPUs
+    :return: the parsed messages of each file, in the order of files
+    """
+    if len(files) == 0:
+        return
+
+    if workers is None or workers < 1:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(files))
+
+    chunkSize = max(1, math.ceil(len(files) / (workers * CHUNKS_PER_WORKER)))
+    chunks = [files[i:i + chunkSize] for i in range(0, len(files), chunkSize)]
+
+    # spawn, forking a process running Qt is not safe
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=initializeWorker, initargs=(types,)) as executor:
+        for results in executor.map(parseChunk, chunks):
+            yield from results
@@ -1,10 +1,14 @@
-from typing import Tuple, List, Dict, Optional
+import re
+from typing import Tuple, List, Dict, Optional, Match, Set, Iterable
 
 from pytide_message_generator.dataprovider.field_data import FieldData
 from pytide_message_generator.dataprovider.message_data import MessageData
-from pytide_message_generator.io.asciiparser.asciiparser import AsciiParser, AsciiParserException
+from pytide_message_generator.io.asciiparser.asciiparser import AsciiParser, AsciiParserException, composeFloat
 from pytide_message_generator.io.filewriter import readFile
 
+# Bump whenever a change to the parser changes the parsed messages, this invalidates persisted parse results
+ROS1_PARSER_VERSION = 2
+
 ROS_MSG_PRIMITIVES = ["bool", "int8", "uint8", "int16", "uint16", "int32", "uint32", "int64", "uint64", "float32",
                       "float64", "string", "time", "duration"]
 
@@ -24,21 +28,123 @@ MESSAGE_TYPE_ALIASSES = {
     "byte": "int8",
 }
 
+ROS_INTEGER_TYPES = ["int8", "uint8", "int16", "uint16", "int32", "uint32", "int64", "uint64"]
+ROS_FLOAT_TYPES = ["float32", "float64"]
+
+# A complete single line field declaration: 'type[N] name [= constant] [# comment]'. Lines that do not match
+# (declarations spanning lines, trailing garbage, ...) are handled by the character based parser
+FIELD_LINE_PATTERN = re.compile(
+    r'(?P<type>[A-Za-z][A-Za-z0-9_/]*)(?=[ \[])[^\S\n]*'
+    r'(?:(?P<array>\[)[^\S\n]*(?P<length>[0-9]+)?[^\S\n]*\][^\S\n]*)?'
+    r'(?P<name>[A-Za-z][A-Za-z0-9_]*)[ \t]*'
+    r'(?:=[ \t]*(?P<value>[^#\n]*?)[ \t]*)?'
+    r'(?:#(?P<comment>[^\n]*))?[^\S\n]*(?=\n|\Z)'
+)
+
+INTEGER_CONSTANT_PATTERN = re.compile(r'-?[0-9]+')
+FLOAT_CONSTANT_PATTERN = re.compile(r'(?P<sign>-?)(?P<point>\.?)(?P<digits>[0-9][0-9.]*)(?:[eE](?P<exp>-?[0-9]+))?')
+BOOL_CONSTANTS = {"True": True, "true": True, "False": False, "false": False}
+
+ROS_PRIMITIVE_SET = frozenset(ROS_MSG_PRIMITIVES)
+
+
+class UnresolvedTypesException(Exception):
+    """
+    Raised if field types of the loaded messages can not be resolved unambiguously
+    """
+
+    def __init__(self, issues: List[str]):
+        super(UnresolvedTypesException, self).__init__(
+            "{} unresolved or ambiguous field types:\n{}".format(len(issues), "\n".join(issues)))
+        self.issues: List[str] = issues
+
+
 class Ros1Parser(AsciiParser):
 
-    def __init__(self, data=""):
+    def __init__(self, data="", fastPath: bool = True):
         super(Ros1Parser, self).__init__(data=data)
 
-        self.message_names = []
-        self.localMessageNames: Dict[str, List[str]] = {}
+        self.fastPath: bool = fastPath
+
+        self.message_names: Set[str] = set()
+        self.localMessageNames: Dict[str, Set[str]] = {}
+        # type -> all files defining it, for types defined more than once
+        self.duplicateTypes: Dict[str, List[str]] = {}
+        self.typeSources: Dict[str, str] = {}
 
     def buildTypeChecks (self, types: List[Tuple[str, str, str]]):
 
-        for type in types:
-            self.message_names.append("/".join(type[:2]))
-            if type[0] not in self.localMessageNames:
-                self.localMessageNames[type[0]] = []
-            self.localMessageNames[type[0]].append(type[1])
+        for package, name, path in types:
+            if path.endswith('.srv'):
+                names = ["{}Request".format(name), "{}Response".format(name)]
+            else:
+                names = [name]
+
+            local = self.localMessageNames.setdefault(package, set())
+            for messageName in names:
+                typeName = "{}/{}".format(package, messageName)
+                if typeName in self.message_names:
+                    self.duplicateTypes.setdefault(typeName, [self.typeSources[typeName]]).append(path)
+                else:
+                    self.typeSources[typeName] = path
+
+                self.message_names.add(typeName)
+                local.add(messageName)
+
+    def resolveType(self, package: str, type: str) -> Optional[str]:
+        """
+        Resolves a field type the same way the generators look it up, first as full type name, then within the
+        package of the message
+
+        :return: the full name of the type, or None if no message of that type was registered
+        """
+        if type in self.message_names:
+            return type
+        if type in self.localMessageNames.get(package, ()):
+            return "{}/{}".format(package, type)
+        return None
+
+    def validateMessage(self, message: MessageData) -> List[str]:
+        """
+        Checks the field types of a message against the type table built by buildTypeChecks
+
+        :return: a description of every unresolved or ambiguous field type, prefixed by file and line
+        """
+        issues = []
+        package = "/".join(message.package)
+        for field in message.fields:
+            type = field.field_type
+            if type in ROS_PRIMITIVE_SET:
+                continue
+
+            resolved = self.resolveType(package, type)
+            if resolved is None:
+                issues.append("{}:{}: Unresolved type '{}' of field '{}' in {}".format(
+                    message.source_path, field.line, type, field.field_name, message.getID()))
+            elif resolved in self.duplicateTypes:
+                issues.append("{}:{}: Ambiguous type '{}' of field '{}' in {}, defined in: {}".format(
+                    message.source_path, field.line, type, field.field_name, message.getID(),
+                    ", ".join(self.duplicateTypes[resolved])))
+        return issues
+
+    def validateTypes(self, messages: Iterable[MessageData]) -> List[str]:
+        """
+        Checks the field types of all messages in a single pass, see validateMessage
+        """
+        issues = []
+        for message in messages:
+            issues.extend(self.validateMessage(message))
+        return issues
+
+    def parseFile(self, package: str, name: str, path: str) -> List[MessageData]:
+        """
+        Parses a *.msg or *.srv file
+
+        :return: the message of a *.msg file, or the request and response messages of a *.srv file
+        """
+        if path.endswith('.srv'):
+            return self.parseService(package, name, path)
+        return [self.parseMessage(package, name, path)]
 
     def parseMessage(self, package: str, name: str, path: str) -> MessageData:
         message = readFile(path)
@@ -53,7 +159,7 @@ class Ros1Parser(AsciiParser):
                 fields.append(field)
             self.skipWhitespace()
 
-        return MessageData([package], name, fields)
+        return MessageData([package], name, fields, source_path=path)
 
     def parseService(self, package: str, name: str, path: str) -> List[MessageData]:
         message = readFile(path)
@@ -71,12 +177,12 @@ class Ros1Parser(AsciiParser):
                 fields.append(field)
 
             if new_msg:
-                messages.append(MessageData([package], "{}Request".format(name), fields))
+                messages.append(MessageData([package], "{}Request".format(name), fields, source_path=path))
                 fields = []
 
             self.skipWhitespace()
 
-        messages.append(MessageData([package], "{}Response".format(name), fields))
+        messages.append(MessageData([package], "{}Response".format(name), fields, source_path=path))
 
         messages[0].srv_siblings = [messages[1]]
         messages[0].srv_name = name
@@ -102,6 +208,16 @@ class Ros1Parser(AsciiParser):
                 self.validate('---')
                 return None, True
             else:
+                if self.fastPath:
+                    start = self.getPosition()
+                    match = self.readPattern(FIELD_LINE_PATTERN)
+                    if match is not None:
+                        field = self.fieldFromMatch(match, comments, self.getLinePosition(start)[0])
+                        if field is not None:
+                            return field, False
+                        self.setPosition(start)
+
+                line = self.getLinePosition()[0]
                 field_type = self.readToSeperator([' ', '['])
                 if field_type in MESSAGE_TYPE_ALIASSES:
                     field_type = MESSAGE_TYPE_ALIASSES[field_type]
@@ -149,17 +265,63 @@ class Ros1Parser(AsciiParser):
                 if eol != '':
                     print("Rest of Line: {}".format(eol))
                 return FieldData(field_type, field_name, isArray, array_fixed_length=fixedLength,
-                                 constant_value=constantValue, comment="\n".join(comments)), False
+                                 constant_value=constantValue, comment="\n".join(comments), line=line), False
             self.skipWhitespace()
 
         return None, False
 
+    def fieldFromMatch(self, match: Match, comments: List[str], line: int = -1) -> Optional[FieldData]:
+        """
+        Builds the field for a line matched by FIELD_LINE_PATTERN
+
+        :param match: the match of the complete line
+        :param comments: the comments preceding the field
+        :param line: the line of the field in the source file
+        :return: the field, or None if the constant value needs the character based parser
+        """
+        field_type = match.group('type')
+        field_type = MESSAGE_TYPE_ALIASSES.get(field_type, field_type)
+
+        constantValue = None
+        comment = match.group('comment')
+
+        value = match.group('value')
+        if value is not None:
+            if field_type == 'string':
+                # String constants span the rest of the line, including any '#'
+                constantValue = match.string[match.start('value'):match.end()]
+                comment = None
+            elif field_type in ROS_INTEGER_TYPES:
+                if INTEGER_CONSTANT_PATTERN.fullmatch(value) is None:
+                    return None
+                constantValue = int(value)
+            elif field_type in ROS_FLOAT_TYPES:
+                number = FLOAT_CONSTANT_PATTERN.fullmatch(value)
+                if number is None:
+                    return None
+                constantValue = composeFloat(number.group('digits'), number.group('point') != '',
+                                             number.group('sign') != '', int(number.group('exp') or 0))
+            elif field_type == 'bool':
+                if value not in BOOL_CONSTANTS:
+                    return None
+                constantValue = BOOL_CONSTANTS[value]
+            else:
+                return None
+
+        if comment is not None:
+            comments.append(comment.strip())
+
+        length = match.group('length')
+        return FieldData(field_type, match.group('name'), match.group('array') is not None,
+                         array_fixed_length=int(length) if length is not None else -1,
+                         constant_value=constantValue, comment="\n".join(comments), line=line)
+
     def readConstantValue(self, expected_type):
         if expected_type == 'bool':
             return self.readBool()
-        elif expected_type in ["int8", "uint8", "int16", "uint16", "int32", "uint32", "int64", "uint64"]:
+        elif expected_type in ROS_INTEGER_TYPES:
             return self.readInteger()
-        elif expected_type in ["float32", "float64"]:
+        elif expected_type in ROS_FLOAT_TYPES:
             return self.readFloat()
         elif expected_type == "string":
             return self.readToEndOfLine()
@@ -1,12 +1,12 @@
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Callable
 
 from PyQt6.QtWidgets import QWidget
 
 from .msgfile_settings_widget import MsgFileSettingsWidget
 from pytide_message_generator.dataprovider.message_data import MessageData
 from pytide_message_generator.generator.igenerator import IGenerator
-from .ros1msg.ros1gen import Ros1Gen
+from .ros1msg.ros1gen import generateMessageFiles
 
 
 class MsgFileGenerator(IGenerator):
@@ -32,13 +32,16 @@ class MsgFileGenerator(IGenerator):
         """
         return self.settingsWidget
 
-    def generateFromWidgetSettings(self, messages: List[MessageData], messageDB: Dict[str, MessageData], path: str, settings: QWidget):
-        self.generateFromDictSettings(messages, messageDB, path, {})
+    def getSettingsDict(self, settings: MsgFileSettingsWidget) -> Dict:
+        return {
+            "incremental": settings.incremental_check.isChecked(),
+        }
 
     def generateFromDictSettings(self, messages: List[MessageData], messageDB: Dict[str, MessageData], path: str, settings: Dict):
-        ros_gen = Ros1Gen()
+        generateMessageFiles(messages, messageDB, path, settings)
 
-        for message in messages:
-            ros_gen.generateFile(message, messageDB, settings)
+    def getGenerationFunction(self) -> Callable:
+        return generateMessageFiles
 
-        ros_gen.writeOutFiles(path)
\ No newline at end of file
+    def supportsProcesses(self) -> bool:
+        return True
\ No newline at end of file
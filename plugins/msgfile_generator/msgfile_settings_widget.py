@@ -1,9 +1,12 @@
 from PyQt6 import uic
-from PyQt6.QtWidgets import QWidget
+from PyQt6.QtWidgets import QWidget, QCheckBox
 
 
 class MsgFileSettingsWidget(QWidget):
 
     def __init__(self, base_path: str, parent: QWidget = None):
         super(MsgFileSettingsWidget, self).__init__(parent=parent)
+
+        self.incremental_check: QCheckBox = None
+
         uic.loadUi(base_path + '/resources/gui/settingsWidget.ui', self)
@@ -1,12 +1,14 @@
-from os import makedirs
-from typing import Dict, List, Tuple
+from typing import Dict, List, Tuple, Optional, Set
 
 from pytide_message_generator.dataprovider.field_data import FieldData
 from pytide_message_generator.dataprovider.message_data import MessageData
+from pytide_message_generator.generator.generation_manifest import GenerationManifest, openManifest
+from pytide_message_generator.generator.generation_runner import GenerationProgress
 
-from os.path import isfile, isdir, exists
+from pytide_message_generator.io.filewriter import OutputSink
 
-from pytide_message_generator.io.filewriter import writeFile
+# Bump whenever a change to the generator changes the generated files, this invalidates incremental generation
+ROS1_GENERATOR_VERSION = 1
 
 
 class Ros1Gen:
@@ -15,16 +17,38 @@ class Ros1Gen:
         self.messages_names: List[str] = []
         self.generated_messages: Dict[str, Tuple[str, MessageData]] = {}
 
-        self.generated_services: List[str] = []
+        self.generated_services: Set[str] = set()
+
+        # Set by openManifest for incremental generation
+        self.manifest: Optional[GenerationManifest] = None
+        self.messageHashes: Dict[str, str] = {}
+
+    def openManifest(self, base_path: str, messageDB: Dict[str, MessageData], settings: Dict):
+        """
+        Enables incremental generation if it is enabled in the settings, unchanged messages are skipped
+        """
+        self.manifest = openManifest(base_path + "/msg_files", "ros1/{}".format(ROS1_GENERATOR_VERSION), messageDB,
+                                     settings)
 
     def generateFile(self, message: MessageData, messageDB: Dict[str, MessageData], settings: Dict):
+        if self.manifest is not None:
+            # a service is written as one file, recorded under its first message
+            if message.isService:
+                message = min([message, *message.srv_siblings], key=lambda m: m.srv_index)
+            digest = self.manifest.computeHash(message)
+            if self.manifest.isUpToDate(message, digest):
+                return
+            self.messageHashes[message.getID()] = digest
+
         if message.isService:
             self.generateService(message, messageDB, settings)
         else:
             self.generateMessage(message, messageDB, settings)
 
     def generateService(self, message: MessageData, messageDB: Dict[str, MessageData], settings: Dict):
-        if message.srv_name in self.generated_services:
+        # services of different packages may share a name
+        serviceID = "/".join([*message.package, message.srv_name])
+        if serviceID in self.generated_services:
             return
         service_msgs = [message, *message.srv_siblings]
 
@@ -41,9 +65,9 @@ class Ros1Gen:
                 fields.append(self.generateField(field, messageDB, settings))
             src.append('\n'.join(fields))
 
-        self.messages_names.append(message.getID())
-        self.generated_messages[message.getID()] = ("\n---\n".join(src), message)
-        self.generated_services.append(message.srv_name)
+        self.messages_names.append(service_msgs[0].getID())
+        self.generated_messages[service_msgs[0].getID()] = ("\n---\n".join(src), service_msgs[0])
+        self.generated_services.add(serviceID)
 
     def generateMessage(self, message: MessageData, messageDB: Dict[str, MessageData], settings: Dict):
         fields = []
@@ -75,26 +99,67 @@ class Ros1Gen:
 
         return ''.join(field_value)
 
-    def writeOutFiles(self, base_path: str):
-        for msgID in self.generated_messages:
-            source, message = self.generated_messages[msgID]
-            messagePath = base_path + "/msg_files"
-            for package in message.package:
-                messagePath += '/' + package
+    def writeOutFiles(self, base_path: str, sink: Optional[OutputSink] = None):
+        """
+        Writes all generated files
 
+        :param sink: the sink to write through, a sink of its own is used if None
+        """
+        ownSink = sink is None
+        if ownSink:
+            sink = OutputSink()
 
-            if message.isService:
-                messagePath += '/srvs'
-                if not exists(messagePath):
-                    makedirs(messagePath)
-                writeFile(messagePath + '/' + message.srv_name + '.srv', source)
-            else:
-                messagePath += '/msgs'
-                if not exists(messagePath):
-                    makedirs(messagePath)
-                writeFile(messagePath + '/' + message.name + '.msg', source)
+        try:
+            for msgID in self.generated_messages:
+                source, message = self.generated_messages[msgID]
+                messagePath = base_path + "/msg_files"
+                for package in message.package:
+                    messagePath += '/' + package
+
+                if message.isService:
+                    filePath = messagePath + '/srvs/' + message.srv_name + '.srv'
+                else:
+                    filePath = messagePath + '/msgs/' + message.name + '.msg'
+                sink.write(filePath, source)
+
+                if self.manifest is not None:
+                    self.manifest.update(message, self.messageHashes[msgID], filePath)
+
+            sink.flush()
+        finally:
+            if ownSink:
+                sink.close()
+
+        if self.manifest is not None:
+            self.manifest.save()
 
 
     def clear(self):
         self.messages_names.clear()
-        self.generated_messages.clear()
\ No newline at end of file
+        self.generated_messages.clear()
+        self.generated_services.clear()
+        self.messageHashes.clear()
+
+
+def generateMessageFiles(messages: List[MessageData], messageDB: Dict[str, MessageData], path: str, settings: Dict,
+                         progress: Optional[GenerationProgress] = None):
+    """
+    Generates and writes the *.msg and *.srv files of the given messages. Does not use Qt, so it can run in a worker
+    process
+
+    :param progress: receives a step per generated message and is checked for cancellation between messages
+    """
+    if progress is None:
+        progress = GenerationProgress()
+
+    ros_gen = Ros1Gen()
+    ros_gen.openManifest(path, messageDB, settings)
+
+    progress.setTotal(len(messages))
+    for message in messages:
+        progress.checkCancelled()
+        ros_gen.generateFile(message, messageDB, settings)
+        progress.step()
+
+    progress.checkCancelled()
+    ros_gen.writeOutFiles(path)
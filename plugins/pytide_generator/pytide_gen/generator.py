@@ -1,11 +1,19 @@
 from datetime import datetime
-from os import makedirs
-from os.path import exists
+from functools import partial
 from string import Template
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Set, Optional
 
+from pytide_message_generator.dataprovider.field_data import FieldData
 from pytide_message_generator.dataprovider.message_data import MessageData
-from pytide_message_generator.io.filewriter import readFile, writeFile
+from pytide_message_generator.generator.dependency_graph import DependencyGraph
+from pytide_message_generator.generator.generation_manifest import GenerationManifest, openManifest, hashTemplates
+from pytide_message_generator.generator.generation_runner import GenerationProgress
+from pytide_message_generator.generator.level_renderer import renderLevels
+from pytide_message_generator.generator.template_cache import getTemplate
+from pytide_message_generator.io.filewriter import OutputSink
+
+# Bump whenever a change to the generator changes the generated sources, this invalidates incremental generation
+PYTIDE_GENERATOR_VERSION = 1
 
 PRIMITIVE_TYPE_MAP = {
     "bool": "bool",
@@ -71,24 +79,155 @@ PRIMITIVE_DESERIALISATION_MAP = {
     "string": "getString",
 }
 
+# Little endian struct formats of the fixed-width types combined by packed serializers. bool is left out, its encoding
+# is up to the Message implementation
+STRUCT_FORMAT_MAP = {
+    "int8": "b",
+    "uint8": "B",
+    "int16": "h",
+    "uint16": "H",
+    "int32": "i",
+    "uint32": "I",
+    "int64": "q",
+    "uint64": "Q",
+    "float32": "f",
+    "float64": "d",
+    "time": "II",
+    "duration": "ii",
+}
+
+# Little endian NumPy dtypes of the numeric array fields generated as numpy.ndarray
+NUMPY_DTYPE_MAP = {
+    "int8": "<i1",
+    "uint8": "<u1",
+    "int16": "<i2",
+    "uint16": "<u2",
+    "int32": "<i4",
+    "uint32": "<u4",
+    "int64": "<i8",
+    "uint64": "<u8",
+    "float32": "<f4",
+    "float64": "<f8",
+}
+
+# Bytes per value on the wire, as read by lazy decoding and counted by serializedSize. Lengths of strings and dynamic
+# arrays are VarULongs. bool is left out like in STRUCT_FORMAT_MAP, fields holding bools have no fixed layout
+WIRE_SIZE_MAP = {
+    "int8": 1,
+    "uint8": 1,
+    "int16": 2,
+    "uint16": 2,
+    "int32": 4,
+    "uint32": 4,
+    "int64": 8,
+    "uint64": 8,
+    "float32": 4,
+    "float64": 8,
+    "time": 8,
+    "duration": 8,
+}
+
+# Attributes of lazily decoded messages besides their fields
+LAZY_STATE_SLOTS = ["_raw", "_base", "_offsets", "_size", "_dirty"]
+
+# Runs of fewer values are serialized field by field
+PACKED_RUN_MIN_VALUES = 2
+
+# Module with the bulk buffer access of packed serializers, generated into the base package
+SUPPORT_MODULE_NAME = "_pytide_support"
+
 class CodeGenerator:
 
     def __init__(self, plugin_basepath):
+        self.plugin_basepath = plugin_basepath
 
-        self.messages_names: List[str] = []
+        self.messages_names: Set[str] = set()
         self.generated_messages: Dict[str, Tuple[str, MessageData]] = {}
 
-        self.dependencyTemplate: Template = Template(readFile(plugin_basepath + '/resources/src/dependency.template'))
-        self.constantTemplate: Template = Template(readFile(plugin_basepath + '/resources/src/constant.template'))
-        self.constructorTemplate: Template = Template(readFile(plugin_basepath + '/resources/src/constructor.template'))
-        self.accessorTemplate: Template = Template(readFile(plugin_basepath + '/resources/src/accessor.template'))
-
-        self.messageTemplate: Template = Template(readFile(plugin_basepath + '/resources/src/message.template'))
+        # Set by openManifest for incremental generation
+        self.manifest: Optional[GenerationManifest] = None
+        self.messageHashes: Dict[str, str] = {}
+
+        # Dependency graph of the last messageDB generated from
+        self.dependencyGraph: Optional[DependencyGraph] = None
+
+        # Fragments that are requested for every field referencing a message, valid for one messageDB and settings
+        self.memoDB: Optional[Dict[str, MessageData]] = None
+        self.memoSettings: Optional[Dict] = None
+        self.resolvedTypes: Dict[Tuple[Tuple[str, ...], str], Optional[MessageData]] = {}
+        self.typeAliases: Dict[Tuple[Tuple[str, ...], str], str] = {}
+        self.packageNames: Dict[str, str] = {}
+        # message ID -> (struct format, number of values) of messages of fixed width, None for all others
+        self.packedFormats: Dict[str, Optional[Tuple[str, int]]] = {}
+        # message ID -> size on the wire of messages of fixed size, None for all others
+        self.wireSizes: Dict[str, Optional[int]] = {}
+        # message ID -> whether the message is decoded lazily
+        self.lazyMessages: Dict[str, bool] = {}
+
+        self.dependencyTemplate: Template = getTemplate(plugin_basepath + '/resources/src/dependency.template')
+        self.constantTemplate: Template = getTemplate(plugin_basepath + '/resources/src/constant.template')
+        self.constructorTemplate: Template = getTemplate(plugin_basepath + '/resources/src/constructor.template')
+        self.accessorTemplate: Template = getTemplate(plugin_basepath + '/resources/src/accessor.template')
+        self.lazyAccessorTemplate: Template = getTemplate(plugin_basepath + '/resources/src/lazy_accessor.template')
+        self.lazyTemplate: Template = getTemplate(plugin_basepath + '/resources/src/lazy.template')
+        self.bufferTemplate: Template = getTemplate(plugin_basepath + '/resources/src/buffer.template')
+
+        self.messageTemplate: Template = getTemplate(plugin_basepath + '/resources/src/message.template')
+        self.supportTemplate: Template = getTemplate(plugin_basepath + '/resources/src/support.template')
 
     def generateFile(self, message: MessageData, messageDB: Dict[str, MessageData], settings: Dict):
-        if message.getID() in self.messages_names:
-            return
-        self.messages_names.append(message.getID())
+        """
+        Generates message and all messages it depends on
+        """
+        self.generateFiles([message], messageDB, settings)
+
+    def generateFiles(self, messages: List[MessageData], messageDB: Dict[str, MessageData], settings: Dict,
+                      workers: int = 1, progress: Optional[GenerationProgress] = None):
+        """
+        Generates messages and all messages they depend on. The messages are rendered level by level of their
+        dependency graph, independent messages of large levels in parallel.
+
+        :param workers: maximal number of worker processes rendering in parallel
+        :param progress: its total is set to the number of messages to generate, receives a step per message
+        """
+        if progress is None:
+            progress = GenerationProgress()
+        self.checkMemo(messageDB, settings)
+
+        graph = self.getDependencyGraph(messageDB)
+        for cycle in graph.findCycles(messages, self.messages_names):
+            print("Cyclic dependency between: {}".format(", ".join(m.getID() for m in cycle)))
+
+        levels = []
+        for level in graph.levels(messages, self.messages_names):
+            pending = []
+            for message in level:
+                self.messages_names.add(message.getID())
+
+                if self.manifest is not None:
+                    digest = self.manifest.computeHash(message)
+                    self.messageHashes[message.getID()] = digest
+                    if self.manifest.isUpToDate(message, digest):
+                        continue
+                pending.append(message)
+            levels.append(pending)
+
+        progress.setTotal(sum(len(level) for level in levels))
+        for message, source in renderLevels(levels, lambda m: self.renderFile(m, messageDB, settings),
+                                            partial(CodeGenerator, self.plugin_basepath), messageDB, settings,
+                                            workers, progress):
+            self.generated_messages[message.getID()] = (source, message)
+
+    def getDependencyGraph(self, messageDB: Dict[str, MessageData]) -> DependencyGraph:
+        if self.dependencyGraph is None or self.dependencyGraph.messageDB is not messageDB:
+            self.dependencyGraph = DependencyGraph(messageDB)
+        return self.dependencyGraph
+
+    def renderFile(self, message: MessageData, messageDB: Dict[str, MessageData], settings: Dict) -> str:
+        """
+        :return: the source of message, the messages it depends on are not generated
+        """
+        self.checkMemo(messageDB, settings)
 
         variables = {
             "timestamp": datetime.now().strftime("%d %b %Y, %H:%M:%S"),
@@ -100,9 +239,10 @@ class CodeGenerator:
             "accessors": self.generateAccessors(message, messageDB, settings),
             "message_serializer": self.generateSerializers(message, messageDB, settings),
             "message_deserializer": self.generateDeserializers(message, messageDB, settings),
+            "buffer_serializer": self.generateBufferSerialization(message, messageDB, settings),
         }
 
-        self.generated_messages[message.getID()] = (self.messageTemplate.substitute(variables), message)
+        return self.messageTemplate.substitute(variables)
 
     def determineClassName(self, message: MessageData, settings: Dict) -> str:
         return message.name
@@ -110,6 +250,43 @@ class CodeGenerator:
     def determineAlias(self, message: MessageData, settings: Dict) -> str:
         return message.name
 
+    def checkMemo(self, messageDB: Dict[str, MessageData], settings: Dict):
+        """
+        Drops all memoized fragments if they were computed for another messageDB or other settings
+        """
+        if messageDB is self.memoDB and settings is self.memoSettings:
+            return
+
+        self.memoDB = messageDB
+        self.memoSettings = settings
+        self.resolvedTypes.clear()
+        self.typeAliases.clear()
+        self.packageNames.clear()
+        self.packedFormats.clear()
+        self.wireSizes.clear()
+        self.lazyMessages.clear()
+
+    def getPackageName(self, message: MessageData, settings: Dict) -> str:
+        """
+        Memoized determinePackageName
+        """
+        packageName = self.packageNames.get(message.getID())
+        if packageName is None:
+            packageName = self.determinePackageName(message, settings)
+            self.packageNames[message.getID()] = packageName
+        return packageName
+
+    def getTypeAlias(self, ownMessage: MessageData, type: str, messageDB: Dict[str, MessageData], settings: Dict) -> str:
+        """
+        :return: the alias of the message referenced by a field of type in ownMessage, memoized
+        """
+        key = (ownMessage.package, type)
+        alias = self.typeAliases.get(key)
+        if alias is None:
+            alias = self.determineAlias(self.getMessageFromType(ownMessage, type, messageDB), settings)
+            self.typeAliases[key] = alias
+        return alias
+
     def determinePackageName(self, message: MessageData, settings: Dict):
         base_package = []
         if settings['base_package'] is not None and settings['base_package'] != '':
@@ -118,22 +295,26 @@ class CodeGenerator:
         return '.'.join([*base_package, *message.package, message.name.lower()])
 
     def getMessageFromType(self, ownMessage: MessageData, type: str, messageDB: Dict[str, MessageData]) -> MessageData:
-        if type in messageDB:
-            return messageDB[type]
+        key = (ownMessage.package, type)
+        if key in self.resolvedTypes:
+            message = self.resolvedTypes[key]
         else:
-            localType = "/".join([*ownMessage.package, type])
-            if localType in messageDB:
-                return messageDB[localType]
-            else:
-                print("Missing Dependency for Type: {}".format(type))
-                return None
+            message = messageDB.get(type)
+            if message is None:
+                message = messageDB.get("/".join([*ownMessage.package, type]))
+            self.resolvedTypes[key] = message
+
+        if message is None:
+            print("Missing Dependency for Type: {}".format(type))
+        return message
 
     def generateDependencies(self, message: MessageData, messageDB: Dict[str, MessageData], settings: Dict) -> str:
         types = []
         for field in message.fields:
             types.append(field.field_type)
 
-        types = list(set(types))
+        # in field order, so every process renders the same source
+        types = list(dict.fromkeys(types))
 
         imports = []
         didImportTuple = False
@@ -148,19 +329,42 @@ class CodeGenerator:
                 if dependentMessage is None:
                     imports.append("# MISSING TYPE: {}".format(type))
                     continue
-                self.generateFile(dependentMessage, messageDB, settings)
 
                 imports.append(self.dependencyTemplate.substitute({
-                    "package": self.determinePackageName(dependentMessage, settings),
+                    "package": self.getPackageName(dependentMessage, settings),
                     "class": self.determineClassName(dependentMessage, settings)
                 }))
 
         if not didImportTuple:
             imports.insert(0, "from typing import List")
 
+        hasNumpyArrays = any(self.isNumpyArray(field, settings) for field in message.fields
+                             if field.constant_value is None)
+        hasBytesArrays = any(self.isBytesArray(field, settings) for field in message.fields
+                             if field.constant_value is None)
+        lazy = self.isLazy(message, messageDB, settings)
+        if settings.get('slots', False) or lazy or hasNumpyArrays:
+            imports.insert(0, "from typing import Optional")
+
         if settings['common_super_class']:
             imports.append("from {} import {}".format(settings['super_class_package'], settings['super_class_name']))
 
+        imports.extend(self.generatePackedDependencies(message, messageDB, settings))
+        if hasNumpyArrays:
+            imports.append("import numpy")
+            imports.append("from {} import putArray, getArray".format(self.getSupportModule(settings)))
+        if hasBytesArrays:
+            imports.append("from {} import putBlob, getBlob".format(self.getSupportModule(settings)))
+        if lazy:
+            imports.append("from struct import unpack_from")
+            imports.append("from {} import UNDECODED, PayloadReader, MessageReader, RawReader, putBytes".format(
+                self.getSupportModule(settings)))
+        if settings.get('buffer_serialization', False):
+            if "from struct import Struct" not in imports:
+                imports.append("from struct import Struct")
+            imports.append("from {} import varULongSize, stringSize, boolsSize, packVarULong, packBlob, packString, "
+                           "packStrings, packBools, packArray, packNumpyArray".format(self.getSupportModule(settings)))
+
         return '\n'.join(imports)
 
     def generateConstants(self, message: MessageData, messageDB: Dict[str, MessageData], settings: Dict) -> str:
@@ -174,16 +378,38 @@ class CodeGenerator:
                         '"{}"'.format(field.constant_value),
                 }))
 
+        for structName, packedFormat, fields in self.getSerializationRuns(message, messageDB, settings):
+            if structName is not None:
+                constants.append('{} = Struct("<{}")'.format(structName, packedFormat))
+
+        if settings.get('buffer_serialization', False):
+            for structName, packedFormat, fields in self.getBufferRuns(message, messageDB, settings):
+                if structName is not None:
+                    constants.append('{} = Struct("<{}")'.format(structName, packedFormat))
+
         return '\n'.join(constants)
 
     def generateConstructor(self, message: MessageData, messageDB: Dict[str, MessageData], settings: Dict) -> str:
+        if self.isLazy(message, messageDB, settings):
+            slots = self.generateSlots(message, messageDB, settings) if settings.get('slots', False) else ""
+            return slots + self.generateLazyConstructor(message, messageDB, settings)
+        if settings.get('slots', False):
+            return self.generateSlots(message, messageDB, settings) + self.generateLazyConstructor(message, messageDB,
+                                                                                                   settings)
+
         args = ['self']
 
         content = []
         for field in message.fields:
             if field.constant_value is not None:
                 continue
-            if field.is_array:
+            if self.isNumpyArray(field, settings):
+                args.append(self.generateNumpyArgument(field))
+                content.append(self.generateNumpyAssignment(field))
+            elif self.isBytesArray(field, settings):
+                args.append(self.generateBytesArgument(field))
+                content.append("self.{}: bytes = {}".format(field.field_name, field.field_name))
+            elif field.is_array:
                 #TODO: Avoid mutable args
                 if field.field_type in PRIMITIVE_TYPE_MAP:
                     args.append("{}: List[{}] = []".format(field.field_name, PRIMITIVE_TYPE_MAP[field.field_type]))
@@ -192,8 +418,7 @@ class CodeGenerator:
                         "self.{}: List[{}] = {}".format(field.field_name, PRIMITIVE_TYPE_MAP[field.field_type],
                                                         field.field_name))
                 else:
-                    dependentMessage = self.getMessageFromType(message, field.field_type, messageDB)
-                    type = self.determineAlias(dependentMessage, settings)
+                    type = self.getTypeAlias(message, field.field_type, messageDB, settings)
 
                     args.append("{}: List[{}] = []".format(field.field_name, type))
 
@@ -208,8 +433,7 @@ class CodeGenerator:
                     content.append("self.{}: {} = {}".format(field.field_name, PRIMITIVE_TYPE_MAP[field.field_type],
                                                              field.field_name))
                 else:
-                    dependentMessage = self.getMessageFromType(message, field.field_type, messageDB)
-                    type = self.determineAlias(dependentMessage, settings)
+                    type = self.getTypeAlias(message, field.field_type, messageDB, settings)
 
                     args.append("{}: {} = {}()".format(field.field_name, type, type))
 
@@ -226,8 +450,104 @@ class CodeGenerator:
 
         return self.constructorTemplate.substitute(variables)
 
+    def generateSlots(self, message: MessageData, messageDB: Dict[str, MessageData], settings: Dict) -> str:
+        names = [field.field_name for field in message.fields if field.constant_value is None]
+        if self.isLazy(message, messageDB, settings):
+            # the fields are properties, their values are stored with a leading underscore
+            names = LAZY_STATE_SLOTS + ["_" + name for name in names]
+        slots = ['"{}", '.format(name) for name in names]
+
+        return "    __slots__ = ({})\n\n".format("".join(slots).rstrip(" "))
+
+    def generateLazyConstructor(self, message: MessageData, messageDB: Dict[str, MessageData], settings: Dict) -> str:
+        """
+        Constructor whose arrays and nested messages default to None, every instance creates its own default objects
+        """
+        args = ['self']
+
+        content = []
+        lazy = self.isLazy(message, messageDB, settings)
+        if lazy:
+            content.append("self._raw: Optional[bytes] = None")
+            content.append("self._base: int = 0")
+            content.append("self._offsets: List[int] = []")
+            content.append("self._size: int = 0")
+            # the raw payload is only serialized as long as no field was set or handed out mutable
+            content.append("self._dirty: bool = True")
+
+        for field in message.fields:
+            if field.constant_value is not None:
+                continue
+            attribute = "_" + field.field_name if lazy else field.field_name
+
+            if field.field_type in PRIMITIVE_TYPE_MAP:
+                type = PRIMITIVE_TYPE_MAP[field.field_type]
+            else:
+                type = self.getTypeAlias(message, field.field_type, messageDB, settings)
+
+            if self.isNumpyArray(field, settings):
+                args.append(self.generateNumpyArgument(field))
+                content.append(self.generateNumpyAssignment(field, attribute))
+            elif self.isBytesArray(field, settings):
+                # bytes are immutable and can be shared
+                args.append(self.generateBytesArgument(field))
+                content.append("self.{}: bytes = {}".format(attribute, field.field_name))
+            elif field.is_array:
+                args.append("{}: Optional[List[{}]] = None".format(field.field_name, type))
+                content.append("self.{}: List[{}] = [] if {} is None else {}".format(attribute, type,
+                                                                                    field.field_name,
+                                                                                    field.field_name))
+            elif field.field_type in PRIMITIVE_TYPE_MAP:
+                # primitive defaults are immutable and can be shared
+                args.append("{}: {} = {}".format(field.field_name, type,
+                                                 PRIMITIVE_DEFAULT_VALUE_MAP[field.field_type]))
+                content.append("self.{}: {} = {}".format(attribute, type, field.field_name))
+            else:
+                args.append("{}: Optional[{}] = None".format(field.field_name, type))
+                content.append("self.{}: {} = {}() if {} is None else {}".format(attribute, type, type,
+                                                                                field.field_name, field.field_name))
+
+        variables = {
+            "args": ", ".join(args),
+            "classname": self.determineClassName(message, settings),
+            "superargs": "",
+            "content": "\n        ".join(content),
+            "msgID": message.getID()
+        }
+
+        return self.constructorTemplate.substitute(variables)
+
+    def isNumpyArray(self, field: FieldData, settings: Dict) -> bool:
+        return field.is_array and field.field_type in NUMPY_DTYPE_MAP and settings.get('numpy_arrays', False) and \
+            not self.isBytesArray(field, settings)
+
+    def isBytesArray(self, field: FieldData, settings: Dict) -> bool:
+        """
+        :return: whether field is a uint8 array generated as bytes, char arrays are parsed as uint8 arrays
+        """
+        return field.is_array and field.field_type == "uint8" and settings.get('bytes_arrays', False)
+
+    def generateBytesArgument(self, field: FieldData) -> str:
+        default = "bytes({})".format(field.array_fixed_length) if field.array_fixed_length > 0 else "b''"
+        return "{}: bytes = {}".format(field.field_name, default)
+
+    def generateNumpyArgument(self, field: FieldData) -> str:
+        return "{}: Optional[numpy.ndarray] = None".format(field.field_name)
+
+    def generateNumpyAssignment(self, field: FieldData, attribute: Optional[str] = None) -> str:
+        """
+        :param attribute: the attribute storing field, its name by default
+        :return: the constructor line storing field, lists are converted and defaults created per instance
+        """
+        return 'self.{}: numpy.ndarray = numpy.zeros({}, dtype="{}") if {} is None else numpy.asarray({}, dtype="{}")'\
+            .format(attribute or field.field_name, max(0, field.array_fixed_length), NUMPY_DTYPE_MAP[field.field_type],
+                    field.field_name, field.field_name, NUMPY_DTYPE_MAP[field.field_type])
+
     def generateAccessors(self, message: MessageData, messageDB: Dict[str, MessageData], settings: Dict) -> str:
         accessors = []
+        lazy = self.isLazy(message, messageDB, settings)
+        if lazy:
+            positions = self.getLazyLayout(message, messageDB, settings)[0]
 
         for field in message.fields:
             if field.constant_value is not None:
@@ -237,20 +557,25 @@ class CodeGenerator:
                 "variable": field.field_name
             }
 
-            if field.is_array:
+            if self.isNumpyArray(field, settings):
+                vars["type"] = "numpy.ndarray"
+            elif self.isBytesArray(field, settings):
+                vars["type"] = "bytes"
+            elif field.is_array:
                 if field.field_type in PRIMITIVE_TYPE_MAP:
                     vars["type"] = "List[{}]".format(PRIMITIVE_TYPE_MAP[field.field_type])
                 else:
-                    dependentMessage = self.getMessageFromType(message, field.field_type, messageDB)
-                    type = self.determineAlias(dependentMessage, settings)
+                    type = self.getTypeAlias(message, field.field_type, messageDB, settings)
                     vars["type"] = "List[{}]".format(type)
             else:
                 if field.field_type in PRIMITIVE_TYPE_MAP:
                     vars["type"] = "{}".format(PRIMITIVE_TYPE_MAP[field.field_type])
                 else:
-                    dependentMessage = self.getMessageFromType(message, field.field_type, messageDB)
-                    type = self.determineAlias(dependentMessage, settings)
+                    type = self.getTypeAlias(message, field.field_type, messageDB, settings)
                     vars["type"] = "{}".format(type)
+            if lazy:
+                accessors.append(self.lazyAccessorTemplate.substitute(vars, decoder="\n            ".join(
+                    self.generateLazyDecoder(message, field, positions[field.field_name], messageDB, settings))))
             accessors.append(self.accessorTemplate.substitute(vars))
 
         return '\n'.join(accessors)
@@ -260,10 +585,28 @@ class CodeGenerator:
             return "pass"
 
         serializers = []
-        for field in message.fields:
-            if field.constant_value is not None:
+        if self.isLazy(message, messageDB, settings):
+            serializers.append("if self._raw is not None and not self._dirty:")
+            serializers.append("    putBytes(message, self._raw[self._base:self._base + self._size])")
+            serializers.append("    return")
+        for structName, packedFormat, fields in self.getSerializationRuns(message, messageDB, settings):
+            if structName is not None:
+                values = []
+                for field in fields:
+                    values.extend(self.getPackedValues(message, field, "self.{}".format(field.field_name),
+                                                       messageDB))
+                serializers.append("putPacked(message, {}, {})".format(structName, ", ".join(values)))
                 continue
-            if field.is_array:
+
+            field = fields[0]
+            if self.isNumpyArray(field, settings):
+                serializers.append('putArray(message, self.{}, "{}"{})'.format(
+                    field.field_name, NUMPY_DTYPE_MAP[field.field_type],
+                    ", includeLength=False" if field.array_fixed_length >= 0 else ""))
+            elif self.isBytesArray(field, settings):
+                serializers.append("putBlob(message, self.{}{})".format(
+                    field.field_name, ", includeLength=False" if field.array_fixed_length >= 0 else ""))
+            elif field.is_array:
                 if field.array_fixed_length < 0:
                     # dynamic length array
                     if field.field_type in PRIMITIVE_SERIALISATION_MAP:
@@ -318,14 +661,31 @@ class CodeGenerator:
         return "\n        ".join(serializers)
 
     def generateDeserializers(self, message: MessageData, messageDB: Dict[str, MessageData], settings: Dict) -> str:
+        if self.isLazy(message, messageDB, settings):
+            return self.generateLazyDeserializer(message, messageDB, settings)
         if len(message.fields) < 1:
             return "pass"
 
         deserializers = []
-        for field in message.fields:
-            if field.constant_value is not None:
+        for structName, packedFormat, fields in self.getSerializationRuns(message, messageDB, settings):
+            if structName is not None:
+                deserializers.append("values = getPacked(message, {})".format(structName))
+                index = 0
+                for field in fields:
+                    value, index = self.getUnpackedValue(message, field, index, messageDB, settings)
+                    deserializers.append("self.{} = {}".format(field.field_name, value))
                 continue
-            if field.is_array:
+
+            field = fields[0]
+            if self.isNumpyArray(field, settings):
+                deserializers.append('self.{} = getArray(message, "{}"{})'.format(
+                    field.field_name, NUMPY_DTYPE_MAP[field.field_type],
+                    ", length={}".format(field.array_fixed_length) if field.array_fixed_length >= 0 else ""))
+            elif self.isBytesArray(field, settings):
+                deserializers.append("self.{} = getBlob(message{})".format(
+                    field.field_name,
+                    ", length={}".format(field.array_fixed_length) if field.array_fixed_length >= 0 else ""))
+            elif field.is_array:
                 if field.array_fixed_length < 0:
                     # dynamic length array
                     if field.field_type in PRIMITIVE_DESERIALISATION_MAP:
@@ -350,8 +710,7 @@ class CodeGenerator:
                         deserializers.append("self.{} = []".format(field.field_name))
                         deserializers.append("for i in range(length):")
 
-                        dependentMessage = self.getMessageFromType(message, field.field_type, messageDB)
-                        type = self.determineAlias(dependentMessage, settings)
+                        type = self.getTypeAlias(message, field.field_type, messageDB, settings)
 
                         deserializers.append("    value: {} = {}()".format(type, type))
                         deserializers.append("    value.deserializeFromMessage(message)")
@@ -380,8 +739,7 @@ class CodeGenerator:
                         deserializers.append("self.{} = []".format(field.field_name))
                         deserializers.append("for i in range({}):".format(field.array_fixed_length))
 
-                        dependentMessage = self.getMessageFromType(message, field.field_type, messageDB)
-                        type = self.determineAlias(dependentMessage, settings)
+                        type = self.getTypeAlias(message, field.field_type, messageDB, settings)
 
                         deserializers.append("    value: {} = {}()".format(type, type))
                         deserializers.append("    value.deserializeFromMessage(message)")
@@ -395,39 +753,624 @@ class CodeGenerator:
                     deserializers.append(
                         "self.{} = (message.getInt32(), message.getInt32())".format(field.field_name))
                 else:
-                    dependentMessage = self.getMessageFromType(message, field.field_type, messageDB)
-                    type = self.determineAlias(dependentMessage, settings)
+                    type = self.getTypeAlias(message, field.field_type, messageDB, settings)
                     deserializers.append("self.{} = {}()".format(field.field_name, type))
                     deserializers.append("self.{}.deserializeFromMessage(message)".format(field.field_name))
 
         return "\n        ".join(deserializers)
 
-    def checkPackage(self, path):
-        if not exists(path):
-            makedirs(path)
-            writeFile("{}/__init__.py".format(path), "")
+    def isLazy(self, message: MessageData, messageDB: Dict[str, MessageData], settings: Dict) -> bool:
+        """
+        Lazy decoding walks the kept payload byte wise, which needs the byte layout of every field. The encoding of bool
+        is up to the Message implementation, so messages holding bools, directly or in nested messages, are decoded
+        eagerly.
+
+        :return: whether message is decoded lazily, memoized
+        """
+        if not settings.get('lazy_decoding', False):
+            return False
+        lazy = self.lazyMessages.get(message.getID())
+        if lazy is None:
+            lazy = not any(field.field_type == "bool" and field.constant_value is None
+                           for member in self.getDependencyGraph(messageDB).closure([message])
+                           for field in member.fields)
+            self.lazyMessages[message.getID()] = lazy
+        return lazy
+
+    def generateLazyDeserializer(self, message: MessageData, messageDB: Dict[str, MessageData], settings: Dict) -> str:
+        """
+        :return: deserializer keeping the payload of message, followed by the methods walking payloads
+        """
+        layout, scan, skip = self.getLazyLayout(message, messageDB, settings)
+        deserializer = [
+            "reader = MessageReader(message)",
+            "self._scan(reader)",
+            "self._raw = reader.getRaw()",
+            "self._base = 0",
+        ]
+
+        return "\n        ".join(deserializer) + "\n\n" + self.lazyTemplate.substitute({
+            "class_name": self.determineClassName(message, settings),
+            "skip": "\n        ".join(skip) if len(skip) > 0 else "pass",
+            "scan": "\n        ".join(scan),
+        })
+
+    def getWireSize(self, ownMessage: MessageData, field: FieldData, messageDB: Dict[str, MessageData]) -> Optional[int]:
+        """
+        :return: the number of bytes of field on the wire if it is the same for every value, otherwise None
+        """
+        if field.field_type in WIRE_SIZE_MAP:
+            size = WIRE_SIZE_MAP[field.field_type]
+        elif field.field_type in PRIMITIVE_TYPE_MAP:
+            return None
+        else:
+            nested = self.getMessageFromType(ownMessage, field.field_type, messageDB)
+            size = self.getMessageWireSize(nested, messageDB) if nested is not None else None
+
+        if size is None or not field.is_array:
+            return size
+        return size * field.array_fixed_length if field.array_fixed_length >= 0 else None
+
+    def getMessageWireSize(self, message: MessageData, messageDB: Dict[str, MessageData]) -> Optional[int]:
+        """
+        :return: the number of bytes of message on the wire if it is the same for every value, memoized
+        """
+        if message.getID() in self.wireSizes:
+            return self.wireSizes[message.getID()]
+        # a message nesting itself has no fixed size
+        self.wireSizes[message.getID()] = None
+
+        size = 0
+        for field in message.fields:
+            if field.constant_value is not None:
+                continue
+            fieldSize = self.getWireSize(message, field, messageDB)
+            if fieldSize is None:
+                return None
+            size += fieldSize
+
+        self.wireSizes[message.getID()] = size
+        return size
+
+    def getLazyLayout(self, message: MessageData, messageDB: Dict[str, MessageData],
+                      settings: Dict) -> Tuple[Dict[str, str], List[str], List[str]]:
+        """
+        Fields in front of the first field of variable size are at fixed positions of the payload. The position of
+        every later field of variable size, and of every run of fixed size fields following one, is recorded while
+        skipping over the payload.
+
+        :return: the expression of the payload position per field name, the lines of _scan and the lines of _skip
+        """
+        positions = {}
+        scan = ["start = reader.offset"]
+        skip = []
+
+        fixedSize = 0
+        anchors = 0
+        # expression of the position the current run of fixed size fields is relative to, None after a field of
+        # variable size
+        anchor = "self._base"
+        for field in message.fields:
+            if field.constant_value is not None:
+                continue
 
-    def writeOutFiles(self, base_path: str, settings: Dict):
-        for msgID in self.generated_messages:
-            source, message = self.generated_messages[msgID]
+            size = self.getWireSize(message, field, messageDB)
+            if size is not None:
+                if anchor is None:
+                    scan.append("offsets.append(reader.offset - start)")
+                    anchor = "self._base + self._offsets[{}]".format(anchors)
+                    anchors += 1
+                positions[field.field_name] = "{} + {}".format(anchor, fixedSize) if fixedSize > 0 else anchor
+                fixedSize += size
+                continue
 
-            messagePath = base_path + "/pytide"
+            if fixedSize > 0:
+                scan.append("reader.skip({})".format(fixedSize))
+                skip.append("reader.skip({})".format(fixedSize))
+                fixedSize = 0
+
+            scan.append("offsets.append(reader.offset - start)")
+            positions[field.field_name] = "self._base + self._offsets[{}]".format(anchors)
+            anchors += 1
+            for line in self.generateLazySkip(message, field, messageDB, settings):
+                scan.append(line)
+                skip.append(line)
+            anchor = None
+
+        if fixedSize > 0:
+            scan.append("reader.skip({})".format(fixedSize))
+            skip.append("reader.skip({})".format(fixedSize))
+
+        if anchors > 0:
+            scan.insert(1, "offsets = []")
+            scan.append("self._offsets = offsets")
+        else:
+            scan.append("self._offsets = []")
+        scan.append("self._size = reader.offset - start")
+        scan.append("self._dirty = False")
+        for field in message.fields:
+            if field.constant_value is None:
+                scan.append("self._{} = UNDECODED".format(field.field_name))
+
+        return positions, scan, skip
+
+    def generateLazySkip(self, ownMessage: MessageData, field: FieldData, messageDB: Dict[str, MessageData],
+                         settings: Dict) -> List[str]:
+        """
+        :return: the lines skipping over the field of variable size on a PayloadReader named reader
+        """
+        if field.field_type == "string":
+            if not field.is_array:
+                return ["reader.skipString()"]
+            if field.array_fixed_length >= 0:
+                return ["reader.skipStrings({})".format(field.array_fixed_length)]
+            return ["reader.skipStrings()"]
+
+        if field.field_type in WIRE_SIZE_MAP:
+            # only dynamic arrays of fixed size types have a variable size
+            return ["reader.skipArray({})".format(WIRE_SIZE_MAP[field.field_type])]
+
+        nested = self.getMessageFromType(ownMessage, field.field_type, messageDB)
+        type = self.getTypeAlias(ownMessage, field.field_type, messageDB, settings)
+        if not field.is_array:
+            return ["{}._skip(reader)".format(type)]
+
+        itemSize = self.getMessageWireSize(nested, messageDB)
+        if itemSize is not None:
+            return ["reader.skipArray({})".format(itemSize)]
+        length = field.array_fixed_length if field.array_fixed_length >= 0 else "reader.getVarULong()"
+        return ["for i in range({}):".format(length),
+                "    {}._skip(reader)".format(type)]
+
+    def generateLazyDecoder(self, ownMessage: MessageData, field: FieldData, position: str,
+                            messageDB: Dict[str, MessageData], settings: Dict) -> List[str]:
+        """
+        :param position: expression of the position of field in the payload
+        :return: the lines decoding field from the payload into its attribute
+        """
+        attribute = "self._{}".format(field.field_name)
+        length = ", {}".format(field.array_fixed_length) if field.array_fixed_length >= 0 else ""
+
+        if not field.is_array:
+            if field.field_type in ["time", "duration"]:
+                return ['{} = unpack_from("<{}", self._raw, {})'.format(attribute, STRUCT_FORMAT_MAP[field.field_type],
+                                                                        position)]
+            if field.field_type in STRUCT_FORMAT_MAP:
+                return ['{} = unpack_from("<{}", self._raw, {})[0]'.format(attribute,
+                                                                           STRUCT_FORMAT_MAP[field.field_type],
+                                                                           position)]
+            if field.field_type == "string":
+                return ["{} = RawReader(self._raw, {}).getString()".format(attribute, position)]
+            decoder = "{}._fromReader(RawReader(self._raw, {}))".format(
+                self.getTypeAlias(ownMessage, field.field_type, messageDB, settings), position)
+        elif self.isBytesArray(field, settings):
+            # a read-only view of the payload, nothing to keep in sync
+            return ["{} = RawReader(self._raw, {}).getBlob({})".format(attribute, position, length.lstrip(", "))]
+        elif self.isNumpyArray(field, settings):
+            decoder = 'RawReader(self._raw, {}).getNumpyArray("{}"{})'.format(position,
+                                                                             NUMPY_DTYPE_MAP[field.field_type], length)
+        elif field.field_type in STRUCT_FORMAT_MAP:
+            decoder = 'RawReader(self._raw, {}).getArray("{}"{})'.format(position, STRUCT_FORMAT_MAP[field.field_type],
+                                                                        length)
+        elif field.field_type == "string":
+            decoder = "RawReader(self._raw, {}).getStrings({})".format(position, length.lstrip(", "))
+        else:
+            decoder = "RawReader(self._raw, {}).getMessages({}{})".format(
+                position, self.getTypeAlias(ownMessage, field.field_type, messageDB, settings), length)
+
+        # arrays and nested messages can be changed in place, the payload is outdated from here on
+        return ["self._dirty = True", "{} = {}".format(attribute, decoder)]
+
+    def getPackedFormat(self, ownMessage: MessageData, field: FieldData, messageDB: Dict[str, MessageData],
+                        settings: Dict) -> Optional[Tuple[str, int]]:
+        """
+        :return: struct format and number of values of field if it has a fixed width, nested messages flattened,
+            otherwise None
+        """
+        if field.field_type in STRUCT_FORMAT_MAP:
+            packedFormat = STRUCT_FORMAT_MAP[field.field_type]
+            if not field.is_array:
+                return packedFormat, len(packedFormat)
+            if field.array_fixed_length > 0 and len(packedFormat) == 1 and not self.isNumpyArray(field, settings) \
+                    and not self.isBytesArray(field, settings):
+                return "{}{}".format(field.array_fixed_length, packedFormat), field.array_fixed_length
+            return None
+
+        if field.is_array or field.field_type in PRIMITIVE_TYPE_MAP:
+            return None
+
+        nested = self.getMessageFromType(ownMessage, field.field_type, messageDB)
+        if nested is None:
+            return None
+        return self.getMessageFormat(nested, messageDB, settings)
+
+    def getMessageFormat(self, message: MessageData, messageDB: Dict[str, MessageData],
+                         settings: Dict) -> Optional[Tuple[str, int]]:
+        """
+        :return: struct format and number of values of all fields of message if it has a fixed width, memoized
+        """
+        if message.getID() in self.packedFormats:
+            return self.packedFormats[message.getID()]
+        # a message nesting itself has no fixed width
+        self.packedFormats[message.getID()] = None
+
+        formats = []
+        count = 0
+        for field in message.fields:
+            if field.constant_value is not None:
+                continue
+            packed = self.getPackedFormat(message, field, messageDB, settings)
+            if packed is None:
+                return None
+            formats.append(packed[0])
+            count += packed[1]
+
+        result = ("".join(formats), count)
+        self.packedFormats[message.getID()] = result
+        return result
+
+    def getSerializationRuns(self, message: MessageData, messageDB: Dict[str, MessageData],
+                             settings: Dict) -> List[Tuple[Optional[str], Optional[str], List[FieldData]]]:
+        """
+        Groups the non constant fields of message the way they are serialized. Without packed serializers every field
+        is serialized on its own, otherwise consecutive fields of fixed width are packed into a single struct.
+
+        :return: (struct name, struct format, fields) per group, struct name and format are None for single fields
+        """
+        fields = [field for field in message.fields if field.constant_value is None]
+        if not settings.get('packed_serializers', False):
+            return [(None, None, [field]) for field in fields]
+
+        runs = []
+        run: List[FieldData] = []
+        runFormat = []
+        runCount = 0
+        for field in fields + [None]:
+            packed = self.getPackedFormat(message, field, messageDB, settings) if field is not None else None
+            if packed is not None:
+                run.append(field)
+                runFormat.append(packed[0])
+                runCount += packed[1]
+                continue
 
-            if not exists(messagePath):
-                makedirs(messagePath)
+            if runCount >= PACKED_RUN_MIN_VALUES:
+                runs.append(("_STRUCT_{}".format(sum(1 for r in runs if r[0] is not None)), "".join(runFormat), run))
+            else:
+                runs.extend((None, None, [runField]) for runField in run)
+            if field is not None:
+                runs.append((None, None, [field]))
+            run = []
+            runFormat = []
+            runCount = 0
+
+        return runs
+
+    def getPackedValues(self, ownMessage: MessageData, field: FieldData, variable: str,
+                        messageDB: Dict[str, MessageData]) -> List[str]:
+        """
+        :return: the expressions of all struct values of the fixed width field stored in variable
+        """
+        if field.field_type in STRUCT_FORMAT_MAP:
+            if field.is_array:
+                return ["*{}".format(variable)]
+            if field.field_type in ["time", "duration"]:
+                return ["{}[0]".format(variable), "{}[1]".format(variable)]
+            return [variable]
+
+        nested = self.getMessageFromType(ownMessage, field.field_type, messageDB)
+        values = []
+        for nestedField in nested.fields:
+            if nestedField.constant_value is None:
+                values.extend(self.getPackedValues(nested, nestedField,
+                                                   "{}.{}".format(variable, nestedField.field_name), messageDB))
+        return values
+
+    def getUnpackedValue(self, ownMessage: MessageData, field: FieldData, index: int,
+                         messageDB: Dict[str, MessageData], settings: Dict) -> Tuple[str, int]:
+        """
+        :param index: index of the first value of field in the unpacked values
+        :return: the expression building the value of the fixed width field and the index of the next value
+        """
+        if field.field_type in STRUCT_FORMAT_MAP:
+            if field.is_array:
+                return "list(values[{}:{}])".format(index, index + field.array_fixed_length), \
+                       index + field.array_fixed_length
+            if field.field_type in ["time", "duration"]:
+                return "(values[{}], values[{}])".format(index, index + 1), index + 2
+            return "values[{}]".format(index), index + 1
+
+        # nested messages are built through their constructors, which take all fields in order
+        nested = self.getMessageFromType(ownMessage, field.field_type, messageDB)
+        args = []
+        for nestedField in nested.fields:
+            if nestedField.constant_value is None:
+                value, index = self.getUnpackedValue(nested, nestedField, index, messageDB, settings)
+                args.append(value)
+        return "{}.{}({})".format(self.getModuleAlias(nested, settings), self.determineClassName(nested, settings),
+                                  ", ".join(args)), index
+
+    def getBufferRuns(self, message: MessageData, messageDB: Dict[str, MessageData],
+                      settings: Dict) -> List[Tuple[Optional[str], Optional[str], List[FieldData]]]:
+        """
+        Groups the non constant fields of message the way serializeInto writes them, consecutive fields of fixed width
+        are packed into a single struct
+
+        :return: (struct name, struct format, fields) per group, struct name and format are None for single fields of
+            variable width
+        """
+        runs = []
+        run: List[FieldData] = []
+        runFormat = []
+        for field in [field for field in message.fields if field.constant_value is None] + [None]:
+            packed = self.getPackedFormat(message, field, messageDB, settings) if field is not None else None
+            if packed is not None:
+                run.append(field)
+                runFormat.append(packed[0])
+                continue
 
-            basePackage = settings['base_package'].split('.')
+            if len(run) > 0:
+                runs.append(("_BUFFER_STRUCT_{}".format(sum(1 for r in runs if r[0] is not None)), "".join(runFormat),
+                             run))
+            if field is not None:
+                runs.append((None, None, [field]))
+            run = []
+            runFormat = []
+
+        return runs
+
+    def getBufferSize(self, ownMessage: MessageData, field: FieldData, messageDB: Dict[str, MessageData],
+                      settings: Dict) -> str:
+        """
+        :return: the expression computing the size on the wire of the variable size field
+        """
+        value = "self.{}".format(field.field_name)
+        if not field.is_array:
+            if field.field_type == "string":
+                return "stringSize({})".format(value)
+            return "{}.serializedSize()".format(value)
+
+        length = "varULongSize(len({})) + ".format(value) if field.array_fixed_length < 0 else ""
+        if field.field_type == "bool":
+            return "{}boolsSize(len({}))".format(length, value)
+        if field.field_type in WIRE_SIZE_MAP:
+            return "{}len({}) * {}".format(length, value, WIRE_SIZE_MAP[field.field_type])
+        if field.field_type == "string":
+            return "{}sum(stringSize(item) for item in {})".format(length, value)
+
+        nested = self.getMessageFromType(ownMessage, field.field_type, messageDB)
+        itemSize = self.getMessageWireSize(nested, messageDB) if nested is not None else None
+        if itemSize is not None:
+            return "{}len({}) * {}".format(length, value, itemSize)
+        return "{}sum(item.serializedSize() for item in {})".format(length, value)
+
+    def generateBufferSerializer(self, ownMessage: MessageData, field: FieldData, messageDB: Dict[str, MessageData],
+                                 settings: Dict) -> List[str]:
+        """
+        :return: the lines writing the variable width field into buffer at offset, advancing offset
+        """
+        value = "self.{}".format(field.field_name)
+        includeLength = ", includeLength=False" if field.is_array and field.array_fixed_length >= 0 else ""
+        if not field.is_array:
+            if field.field_type == "bool":
+                return ["offset = packBools(buffer, offset, ({},), includeLength=False)".format(value)]
+            if field.field_type == "string":
+                return ["offset = packString(buffer, offset, {})".format(value)]
+            return ["offset = {}.serializeInto(buffer, offset)".format(value)]
+
+        if self.isNumpyArray(field, settings):
+            return ['offset = packNumpyArray(buffer, offset, {}, "{}"{})'.format(
+                value, NUMPY_DTYPE_MAP[field.field_type], includeLength)]
+        if self.isBytesArray(field, settings):
+            return ["offset = packBlob(buffer, offset, {}{})".format(value, includeLength)]
+        if field.field_type == "string":
+            return ["offset = packStrings(buffer, offset, {}{})".format(value, includeLength)]
+        if field.field_type == "bool":
+            return ["offset = packBools(buffer, offset, {}{})".format(value, includeLength)]
+        if field.field_type in STRUCT_FORMAT_MAP:
+            return ['offset = packArray(buffer, offset, "{}", {}{})'.format(
+                STRUCT_FORMAT_MAP[field.field_type], value, includeLength)]
 
-            for package in basePackage:
-                messagePath += '/' + package
-                self.checkPackage(messagePath)
+        serializers = []
+        if field.array_fixed_length < 0:
+            serializers.append("offset = packVarULong(buffer, offset, len({}))".format(value))
+        serializers.append("for item in {}:".format(value))
+        serializers.append("    offset = item.serializeInto(buffer, offset)")
+        return serializers
+
+    def generateBufferSerialization(self, message: MessageData, messageDB: Dict[str, MessageData],
+                                    settings: Dict) -> str:
+        """
+        :return: serializedSize and serializeInto of message if buffer serialization is enabled, otherwise nothing
+        """
+        if not settings.get('buffer_serialization', False):
+            return ""
+
+        size = []
+        serializer = []
+        if self.isLazy(message, messageDB, settings):
+            size.append("if self._raw is not None and not self._dirty:")
+            size.append("    return self._size")
+            serializer.append("if self._raw is not None and not self._dirty:")
+            serializer.append("    memoryview(buffer)[offset:offset + self._size] = "
+                              "memoryview(self._raw)[self._base:self._base + self._size]")
+            serializer.append("    return offset + self._size")
+
+        fixedSize = 0
+        # bools in single fields and fixed length arrays, their size is up to Message
+        boolCount = 0
+        variableSizes = []
+        for structName, packedFormat, fields in self.getBufferRuns(message, messageDB, settings):
+            if structName is not None:
+                values = []
+                for field in fields:
+                    values.extend(self.getPackedValues(message, field, "self.{}".format(field.field_name),
+                                                       messageDB))
+                serializer.append("{}.pack_into(buffer, offset, {})".format(structName, ", ".join(values)))
+                serializer.append("offset += {}.size".format(structName))
+                fixedSize += sum(self.getWireSize(message, field, messageDB) for field in fields)
+                continue
+
+            field = fields[0]
+            wireSize = self.getWireSize(message, field, messageDB)
+            if wireSize is not None:
+                fixedSize += wireSize
+            elif field.field_type == "bool" and (not field.is_array or field.array_fixed_length >= 0):
+                boolCount += field.array_fixed_length if field.is_array else 1
+            else:
+                variableSizes.append(self.getBufferSize(message, field, messageDB, settings))
+            serializer.extend(self.generateBufferSerializer(message, field, messageDB, settings))
 
-            for package in message.package:
-                messagePath += '/' + package
-                self.checkPackage(messagePath)
+        if boolCount > 0:
+            variableSizes.insert(0, "boolsSize({})".format(boolCount))
 
-            writeFile("{}/{}.py".format(messagePath, message.name.lower()), source)
+        # fixed size messages fold their size into a constant
+        if len(variableSizes) == 0:
+            size.append("return {}".format(fixedSize))
+        else:
+            size.append("size = {}".format(fixedSize))
+            size.extend("size += {}".format(variableSize) for variableSize in variableSizes)
+            size.append("return size")
+        serializer.append("return offset")
+
+        return self.bufferTemplate.substitute({
+            "size": "\n        ".join(size),
+            "serializer": "\n        ".join(serializer),
+        })
+
+    def getModuleAlias(self, message: MessageData, settings: Dict) -> str:
+        """
+        :return: the name the module of message is imported as by packed deserializers
+        """
+        return "_" + self.getPackageName(message, settings).replace(".", "_")
+
+    def getSupportModule(self, settings: Dict) -> str:
+        return ".".join([package for package in settings['base_package'].split('.') if package != ''] +
+                        [SUPPORT_MODULE_NAME])
+
+    def generatePackedDependencies(self, message: MessageData, messageDB: Dict[str, MessageData],
+                                   settings: Dict) -> List[str]:
+        """
+        :return: the imports needed by the packed serializers of message, including the modules of all flattened
+            messages
+        """
+        packedRuns = [run for run in self.getSerializationRuns(message, messageDB, settings) if run[0] is not None]
+        if len(packedRuns) == 0:
+            return []
+
+        nestedMessages: Dict[str, MessageData] = {}
+        for structName, packedFormat, fields in packedRuns:
+            stack = [(message, field) for field in fields]
+            while len(stack) > 0:
+                ownMessage, field = stack.pop()
+                if field.field_type in STRUCT_FORMAT_MAP:
+                    continue
+                nested = self.getMessageFromType(ownMessage, field.field_type, messageDB)
+                if nested.getID() not in nestedMessages:
+                    nestedMessages[nested.getID()] = nested
+                    stack.extend((nested, nestedField) for nestedField in nested.fields
+                                 if nestedField.constant_value is None)
+
+        imports = ["from struct import Struct"]
+        imports.append("from {} import putPacked, getPacked".format(self.getSupportModule(settings)))
+        for nested in sorted(nestedMessages.values(), key=lambda m: m.getID()):
+            imports.append("import {} as {}".format(self.getPackageName(nested, settings),
+                                                    self.getModuleAlias(nested, settings)))
+        return imports
+
+    def openManifest(self, base_path: str, messageDB: Dict[str, MessageData], settings: Dict):
+        """
+        Enables incremental generation if it is enabled in the settings, unchanged messages are skipped
+        """
+        templates = [self.dependencyTemplate, self.constantTemplate, self.constructorTemplate, self.accessorTemplate,
+                     self.lazyAccessorTemplate, self.lazyTemplate, self.bufferTemplate, self.messageTemplate,
+                     self.supportTemplate]
+        self.manifest = openManifest(base_path + "/pytide", "pytide/{}".format(PYTIDE_GENERATOR_VERSION), messageDB,
+                                     settings, hashTemplates(template.template for template in templates))
+
+    def checkPackage(self, path, sink: OutputSink):
+        if sink.ensureDirectory(path):
+            sink.write("{}/__init__.py".format(path), "")
+
+    def writeOutFiles(self, base_path: str, settings: Dict, sink: Optional[OutputSink] = None):
+        """
+        Writes all generated files
+
+        :param sink: the sink to write through, a sink of its own is used if None
+        """
+        ownSink = sink is None
+        if ownSink:
+            sink = OutputSink()
+
+        try:
+            for msgID in self.generated_messages:
+                source, message = self.generated_messages[msgID]
+
+                messagePath = base_path + "/pytide"
+                sink.ensureDirectory(messagePath)
+
+                basePackage = settings['base_package'].split('.')
+
+                for package in basePackage:
+                    messagePath += '/' + package
+                    self.checkPackage(messagePath, sink)
+
+                for package in message.package:
+                    messagePath += '/' + package
+                    self.checkPackage(messagePath, sink)
+
+                filePath = "{}/{}.py".format(messagePath, message.name.lower())
+                sink.write(filePath, source)
+
+                if self.manifest is not None:
+                    self.manifest.update(message, self.messageHashes[msgID], filePath)
+
+            if self.needsSupportModule(settings):
+                self.writeSupportModule(base_path, settings, sink)
+
+            sink.flush()
+        finally:
+            if ownSink:
+                sink.close()
+
+        if self.manifest is not None:
+            self.manifest.save()
+
+    def needsSupportModule(self, settings: Dict) -> bool:
+        return any(settings.get(option, False) for option in ['packed_serializers', 'numpy_arrays', 'lazy_decoding',
+                                                               'bytes_arrays', 'buffer_serialization'])
+
+    def writeSupportModule(self, base_path: str, settings: Dict, sink: OutputSink):
+        supportPath = base_path + "/pytide"
+        sink.ensureDirectory(supportPath)
+        for package in settings['base_package'].split('.'):
+            if package != '':
+                supportPath += '/' + package
+                self.checkPackage(supportPath, sink)
+
+        # without a timestamp, so unchanged content is not rewritten
+        sink.write("{}/{}.py".format(supportPath, SUPPORT_MODULE_NAME), self.supportTemplate.substitute({}))
 
     def clear(self):
         self.messages_names.clear()
         self.generated_messages.clear()
+        self.messageHashes.clear()
+
+
+def generateMessages(plugin_basepath: str, messages: List[MessageData], messageDB: Dict[str, MessageData], path: str,
+                     settings: Dict, progress: Optional[GenerationProgress] = None):
+    """
+    Generates and writes the python sources of the given messages. Does not use Qt, so it can run in a worker process
+
+    :param plugin_basepath: the directory of the plugin, containing the templates
+    :param progress: receives a step per generated message and is checked for cancellation during rendering
+    """
+    if progress is None:
+        progress = GenerationProgress()
+
+    ros_gen = CodeGenerator(plugin_basepath)
+    ros_gen.openManifest(path, messageDB, settings)
+
+    ros_gen.generateFiles(messages, messageDB, settings, settings.get('render_workers', 1), progress)
+
+    progress.checkCancelled()
+    ros_gen.writeOutFiles(path, settings)
@@ -1,9 +1,10 @@
+from functools import partial
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Callable
 
 from PyQt6.QtWidgets import QWidget, QLineEdit
 
-from .pytide_gen.generator import CodeGenerator
+from .pytide_gen.generator import generateMessages
 from .pytide_settings_widget import PytideSettingsWidget
 from pytide_message_generator.dataprovider.message_data import MessageData
 from pytide_message_generator.generator.igenerator import IGenerator
@@ -19,7 +20,6 @@ class PytideGenerator(IGenerator):
         PLUGIN_DIRECTORY = str(Path(__file__).resolve().parents[0])
 
         self.settingsWidget = PytideSettingsWidget(PLUGIN_DIRECTORY)
-        self.generator = CodeGenerator(PLUGIN_DIRECTORY)
 
     def getLanguage(self) -> str:
         """
@@ -33,7 +33,7 @@ class PytideGenerator(IGenerator):
         """
         return self.settingsWidget
 
-    def generateFromWidgetSettings(self, messages: List[MessageData], messageDB: Dict[str, MessageData], path: str, settings: PytideSettingsWidget):
+    def getSettingsDict(self, settings: PytideSettingsWidget) -> Dict:
         settings_dict = {}
         settings_dict['base_package'] = settings.base_package_edit.text()
         settings_dict['generation_mode'] = settings.generation_mode_combo.currentIndex()
@@ -43,12 +43,23 @@ class PytideGenerator(IGenerator):
         settings_dict['super_class_name'] = settings.super_class_edit.text()
         settings_dict['super_class_package'] = settings.super_package_edit.text()
 
-        self.generateFromDictSettings(messages, messageDB, path, settings_dict)
+        settings_dict['packed_serializers'] = settings.packed_serializers_check.isChecked()
+        settings_dict['slots'] = settings.slots_check.isChecked()
+        settings_dict['numpy_arrays'] = settings.numpy_arrays_check.isChecked()
+        settings_dict['lazy_decoding'] = settings.lazy_decoding_check.isChecked()
+        settings_dict['bytes_arrays'] = settings.bytes_arrays_check.isChecked()
+        settings_dict['buffer_serialization'] = settings.buffer_serialization_check.isChecked()
+
+        settings_dict['incremental'] = settings.incremental_check.isChecked()
+        settings_dict['render_workers'] = settings.render_workers_spin.value()
+
+        return settings_dict
 
     def generateFromDictSettings(self, messages: List[MessageData], messageDB: Dict[str, MessageData], path: str, settings: Dict):
-        ros_gen = CodeGenerator(PLUGIN_DIRECTORY)
+        generateMessages(PLUGIN_DIRECTORY, messages, messageDB, path, settings)
 
-        for message in messages:
-            ros_gen.generateFile(message, messageDB, settings)
+    def getGenerationFunction(self) -> Callable:
+        return partial(generateMessages, PLUGIN_DIRECTORY)
 
-        ros_gen.writeOutFiles(path, settings)
\ No newline at end of file
+    def supportsProcesses(self) -> bool:
+        return True
\ No newline at end of file
@@ -1,5 +1,5 @@
 from PyQt6 import uic
-from PyQt6.QtWidgets import QWidget, QLineEdit, QComboBox, QCheckBox
+from PyQt6.QtWidgets import QWidget, QLineEdit, QComboBox, QCheckBox, QSpinBox
 
 
 class PytideSettingsWidget(QWidget):
@@ -15,4 +15,13 @@ class PytideSettingsWidget(QWidget):
         self.super_package_edit: QLineEdit = None
         self.super_class_edit: QLineEdit = None
 
+        self.incremental_check: QCheckBox = None
+        self.packed_serializers_check: QCheckBox = None
+        self.slots_check: QCheckBox = None
+        self.numpy_arrays_check: QCheckBox = None
+        self.lazy_decoding_check: QCheckBox = None
+        self.bytes_arrays_check: QCheckBox = None
+        self.buffer_serialization_check: QCheckBox = None
+        self.render_workers_spin: QSpinBox = None
+
         uic.loadUi(base_path + '/resources/gui/settingsWidget.ui', self)
@@ -1,11 +1,19 @@
 from datetime import datetime
-from os import makedirs
-from os.path import exists
+from functools import partial
 from string import Template
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional, Set
 
+from pytide_message_generator.dataprovider.field_data import FieldData
 from pytide_message_generator.dataprovider.message_data import MessageData
-from pytide_message_generator.io.filewriter import readFile, writeFile
+from pytide_message_generator.generator.dependency_graph import DependencyGraph
+from pytide_message_generator.generator.generation_manifest import GenerationManifest, openManifest, hashTemplates
+from pytide_message_generator.generator.generation_runner import GenerationProgress
+from pytide_message_generator.generator.level_renderer import renderLevels
+from pytide_message_generator.generator.template_cache import getTemplate
+from pytide_message_generator.io.filewriter import OutputSink
+
+# Bump whenever a change to the generator changes the generated sources, this invalidates incremental generation
+RIPTIDE_GENERATOR_VERSION = 1
 
 PRIMITIVE_TYPE_MAP = {
     "bool": "bool",
@@ -88,6 +96,15 @@ PRIMITIVE_DESERIALISATION_MAP = {
     "string": "GetString",
 }
 
+# Value types of time and duration fields: (struct name, getter and adder of its two components)
+TIME_STRUCT_MAP = {
+    "time": ("RosTime", "GetUInt", "AddUInt"),
+    "duration": ("RosDuration", "GetInt", "AddInt"),
+}
+
+# Namespace of RosTime and RosDuration if no base namespace is set
+SUPPORT_NAMESPACE = "RosMessages"
+
 CSHARP_KEYWORDS = ["abstract", "as", "base", "bool", "break", "byte", "case", "catch", "char", "checked", "class",
                    "const", "continue", "decimal", "default", "delegate", "do", "double", "else", "enum", "event",
                    "explicit", "extern", "false", "finally", "fixed", "float", "for", "foreach", "goto", "if",
@@ -100,22 +117,78 @@ CSHARP_KEYWORDS = ["abstract", "as", "base", "bool", "break", "byte", "case", "c
 class CodeGenerator:
 
     def __init__(self, plugin_basepath):
+        self.plugin_basepath = plugin_basepath
 
-        self.messages_names: List[str] = []
+        self.messages_names: Set[str] = set()
         self.generated_messages: Dict[str, Tuple[str, MessageData]] = {}
 
-        self.dependencyTemplate: Template = Template(readFile(plugin_basepath + '/resources/src/dependency.template'))
-        self.constantTemplate: Template = Template(readFile(plugin_basepath + '/resources/src/constant.template'))
-        self.fieldTemplate: Template = Template(readFile(plugin_basepath + '/resources/src/field.template'))
-        self.constructorTemplate: Template = Template(readFile(plugin_basepath + '/resources/src/constructor.template'))
+        # Set by openManifest for incremental generation
+        self.manifest: Optional[GenerationManifest] = None
+        self.messageHashes: Dict[str, str] = {}
 
-        self.messageTemplate: Template = Template(readFile(plugin_basepath + '/resources/src/message.template'))
+        # Dependency graph of the last messageDB generated from
+        self.dependencyGraph: Optional[DependencyGraph] = None
 
-    def generateFile(self, message: MessageData, messageDB: Dict[str, MessageData], settings: Dict):
-        if message.getID() in self.messages_names:
-            return
-        self.messages_names.append(message.getID())
+        self.dependencyTemplate: Template = getTemplate(plugin_basepath + '/resources/src/dependency.template')
+        self.constantTemplate: Template = getTemplate(plugin_basepath + '/resources/src/constant.template')
+        self.fieldTemplate: Template = getTemplate(plugin_basepath + '/resources/src/field.template')
+        self.constructorTemplate: Template = getTemplate(plugin_basepath + '/resources/src/constructor.template')
+        self.poolTemplate: Template = getTemplate(plugin_basepath + '/resources/src/pool.template')
+        self.timeTemplate: Template = getTemplate(plugin_basepath + '/resources/src/time.template')
+
+        self.messageTemplate: Template = getTemplate(plugin_basepath + '/resources/src/message.template')
 
+    def generateFile(self, message: MessageData, messageDB: Dict[str, MessageData], settings: Dict):
+        """
+        Generates message and all messages it depends on
+        """
+        self.generateFiles([message], messageDB, settings)
+
+    def generateFiles(self, messages: List[MessageData], messageDB: Dict[str, MessageData], settings: Dict,
+                      workers: int = 1, progress: Optional[GenerationProgress] = None):
+        """
+        Generates messages and all messages they depend on. The messages are rendered level by level of their
+        dependency graph, independent messages of large levels in parallel.
+
+        :param workers: maximal number of worker processes rendering in parallel
+        :param progress: its total is set to the number of messages to generate, receives a step per message
+        """
+        if progress is None:
+            progress = GenerationProgress()
+
+        graph = self.getDependencyGraph(messageDB)
+        for cycle in graph.findCycles(messages, self.messages_names):
+            print("Cyclic dependency between: {}".format(", ".join(m.getID() for m in cycle)))
+
+        levels = []
+        for level in graph.levels(messages, self.messages_names):
+            pending = []
+            for message in level:
+                self.messages_names.add(message.getID())
+
+                if self.manifest is not None:
+                    digest = self.manifest.computeHash(message)
+                    self.messageHashes[message.getID()] = digest
+                    if self.manifest.isUpToDate(message, digest):
+                        continue
+                pending.append(message)
+            levels.append(pending)
+
+        progress.setTotal(sum(len(level) for level in levels))
+        for message, source in renderLevels(levels, lambda m: self.renderFile(m, messageDB, settings),
+                                            partial(CodeGenerator, self.plugin_basepath), messageDB, settings,
+                                            workers, progress):
+            self.generated_messages[message.getID()] = (source, message)
+
+    def getDependencyGraph(self, messageDB: Dict[str, MessageData]) -> DependencyGraph:
+        if self.dependencyGraph is None or self.dependencyGraph.messageDB is not messageDB:
+            self.dependencyGraph = DependencyGraph(messageDB)
+        return self.dependencyGraph
+
+    def renderFile(self, message: MessageData, messageDB: Dict[str, MessageData], settings: Dict) -> str:
+        """
+        :return: the source of message, the messages it depends on are not generated
+        """
         variables = {
             "timestamp": datetime.now().strftime("%d %b %Y, %H:%M:%S"),
             "dependencies": self.generateDependencies(message, messageDB, settings),
@@ -126,11 +199,14 @@ class CodeGenerator:
             "constants": self.generateConstants(message, messageDB, settings),
             "fields": self.generateFields(message, messageDB, settings),
             "constructor": self.generateConstructor(message, messageDB, settings),
+            "pooling": self.generatePooling(message, messageDB, settings),
+            "factory": "{}.Rent(msg)".format(self.determineClassName(message, settings)) if settings.get('pooling', False)
+            else "new {}(msg)".format(self.determineClassName(message, settings)),
             "message_serializer": self.generateSerializers(message, messageDB, settings),
             "message_deserializer": self.generateDeserializers(message, messageDB, settings),
         }
 
-        self.generated_messages[message.getID()] = (self.messageTemplate.substitute(variables), message)
+        return self.messageTemplate.substitute(variables)
 
     def sanitizeFieldName(self, name: str):
         if name in CSHARP_KEYWORDS:
@@ -166,7 +242,8 @@ class CodeGenerator:
         for field in message.fields:
             types.append(field.field_type)
 
-        types = list(set(types))
+        # in field order, so every process renders the same source
+        types = list(dict.fromkeys(types))
 
         imports = []
 
@@ -178,7 +255,6 @@ class CodeGenerator:
                 if dependentMessage is None:
                     imports.append("// MISSING TYPE: {}".format(type))
                     continue
-                self.generateFile(dependentMessage, messageDB, settings)
 
                 imports.append(self.dependencyTemplate.substitute({
                     "package": self.determineNamespace(dependentMessage, settings),
@@ -187,7 +263,10 @@ class CodeGenerator:
         if settings['common_base']:
             imports.append("using {};".format(settings['common_base_namespace']))
 
-        imports = list(set(imports))
+        if any(self.isValueTime(field, settings) for field in message.fields):
+            imports.append(self.dependencyTemplate.substitute({"package": self.getSupportNamespace(settings)}))
+
+        imports = list(dict.fromkeys(imports))
         return '\n'.join(imports)
 
     def generateConstants(self, message: MessageData, messageDB: Dict[str, MessageData], settings: Dict) -> str:
@@ -207,11 +286,16 @@ class CodeGenerator:
         constants = []
         for field in message.fields:
             if field.is_array:
-                if field.array_fixed_length < 0:
+                if self.isPlainArray(field, settings):
+                    constants.append(self.fieldTemplate.substitute({
+                        "name": self.sanitizeFieldName(field.field_name),
+                        "type": "{}[]".format(PRIMITIVE_TYPE_MAP[field.field_type])
+                    }))
+                elif field.array_fixed_length < 0:
                     if field.field_type in PRIMITIVE_TYPE_MAP:
                         constants.append(self.fieldTemplate.substitute({
                             "name": self.sanitizeFieldName(field.field_name),
-                            "type": "List<{}>".format(PRIMITIVE_TYPE_MAP[field.field_type])
+                            "type": "List<{}>".format(self.getPrimitiveType(field.field_type, settings))
                         }))
                     else:
                         dependentMessage = self.getMessageFromType(message, field.field_type, messageDB)
@@ -226,7 +310,8 @@ class CodeGenerator:
                     if field.field_type in PRIMITIVE_TYPE_MAP:
                         constants.append(self.fieldTemplate.substitute({
                             "name": self.sanitizeFieldName(field.field_name),
-                            "type": "{}[]".format(PRIMITIVE_TYPE_MAP[field.field_type], field.array_fixed_length)
+                            "type": "{}[]".format(self.getPrimitiveType(field.field_type, settings),
+                                                  field.array_fixed_length)
                         }))
                     else:
                         dependentMessage = self.getMessageFromType(message, field.field_type, messageDB)
@@ -243,7 +328,7 @@ class CodeGenerator:
                     if field.field_type in PRIMITIVE_TYPE_MAP:
                         constants.append(self.fieldTemplate.substitute({
                             "name": self.sanitizeFieldName(field.field_name),
-                            "type": PRIMITIVE_TYPE_MAP[field.field_type]
+                            "type": self.getPrimitiveType(field.field_type, settings)
                         }))
                     else:
                         dependentMessage = self.getMessageFromType(message, field.field_type, messageDB)
@@ -256,6 +341,24 @@ class CodeGenerator:
 
         return '\n        '.join(constants)
 
+    def isPlainArray(self, field: FieldData, settings: Dict) -> bool:
+        """
+        :return: whether field is a dynamic length primitive array generated as a plain array instead of a List
+        """
+        return field.is_array and field.array_fixed_length < 0 and field.field_type in PRIMITIVE_SERIALISATION_MAP \
+            and settings.get('plain_arrays', False)
+
+    def isValueTime(self, field: FieldData, settings: Dict) -> bool:
+        """
+        :return: whether field is a time or duration generated as RosTime or RosDuration value
+        """
+        return field.field_type in TIME_STRUCT_MAP and settings.get('value_time', False)
+
+    def getPrimitiveType(self, type: str, settings: Dict) -> str:
+        if type in TIME_STRUCT_MAP and settings.get('value_time', False):
+            return TIME_STRUCT_MAP[type][0]
+        return PRIMITIVE_TYPE_MAP[type]
+
     def generateConstructor(self, message: MessageData, messageDB: Dict[str, MessageData], settings: Dict) -> str:
         args = []
         content = []
@@ -264,11 +367,13 @@ class CodeGenerator:
             if field.constant_value is None:
                 content.append("this.{} = {};".format(self.sanitizeFieldName(field.field_name), self.sanitizeFieldName(field.field_name)))
                 if field.is_array:
-                    if field.array_fixed_length < 0:
+                    if self.isPlainArray(field, settings):
+                        args.append("{}[] {} = null".format(PRIMITIVE_TYPE_MAP[field.field_type],
+                                                           self.sanitizeFieldName(field.field_name)))
+                    elif field.array_fixed_length < 0:
                         if field.field_type in PRIMITIVE_TYPE_MAP:
-                            args.append("List<{}> {} = null".format(PRIMITIVE_TYPE_MAP[field.field_type],
-                                                                               self.sanitizeFieldName(field.field_name),
-                                                                               PRIMITIVE_TYPE_MAP[field.field_type]))
+                            args.append("List<{}> {} = null".format(self.getPrimitiveType(field.field_type, settings),
+                                                                    self.sanitizeFieldName(field.field_name)))
                         else:
                             dependentMessage = self.getMessageFromType(message, field.field_type, messageDB)
                             type = self.determineAlias(dependentMessage, settings)
@@ -279,8 +384,8 @@ class CodeGenerator:
                         # list
                     else:
                         if field.field_type in PRIMITIVE_TYPE_MAP:
-                            args.append("{}[] {} = null".format(PRIMITIVE_TYPE_MAP[field.field_type],
-                                                                              self.sanitizeFieldName(field.field_name)))
+                            args.append("{}[] {} = null".format(self.getPrimitiveType(field.field_type, settings),
+                                                               self.sanitizeFieldName(field.field_name)))
                         else:
                             dependentMessage = self.getMessageFromType(message, field.field_type, messageDB)
                             type = self.determineAlias(dependentMessage, settings)
@@ -289,7 +394,10 @@ class CodeGenerator:
                         # array
 
                 else:
-                    if field.field_type in PRIMITIVE_TYPE_MAP:
+                    if self.isValueTime(field, settings):
+                        args.append("{} {} = default".format(self.getPrimitiveType(field.field_type, settings),
+                                                             self.sanitizeFieldName(field.field_name)))
+                    elif field.field_type in PRIMITIVE_TYPE_MAP:
                         args.append("{} {} = {}{}".format(PRIMITIVE_TYPE_MAP[field.field_type], self.sanitizeFieldName(field.field_name),
                                                         PRIMITIVE_DEFAULT_VALUE_MAP[field.field_type],
                                                           PRIMITIVE_SUFFIX_MAP[field.field_type]))
@@ -314,8 +422,14 @@ class CodeGenerator:
         for field in message.fields:
             if field.constant_value is not None:
                 continue
-            if field.is_array:
-                if field.array_fixed_length < 0:
+            if self.isValueTime(field, settings):
+                serializers.extend(self.generateValueTimeSerializer(field))
+            elif field.is_array:
+                if self.isPlainArray(field, settings):
+                    # passed as is, nothing to copy
+                    serializers.append("message.{}s(this.{});".format(PRIMITIVE_SERIALISATION_MAP[field.field_type],
+                                                                      self.sanitizeFieldName(field.field_name)))
+                elif field.array_fixed_length < 0:
                     # dynamic length array
                     if field.field_type in PRIMITIVE_SERIALISATION_MAP:
                         serializers.append("message.{}s(this.{}.ToArray());".format(PRIMITIVE_SERIALISATION_MAP[field.field_type],
@@ -377,12 +491,44 @@ class CodeGenerator:
     def generateDeserializers(self, message: MessageData, messageDB: Dict[str, MessageData], settings: Dict) -> str:
         deserializers = []
         isLengthDeclared = False
+        # pooled messages reuse their nested messages, lists and arrays
+        pooling = settings.get('pooling', False)
 
         for field in message.fields:
             if field.constant_value is not None:
                 continue
-            if field.is_array:
-                if field.array_fixed_length < 0:
+            if self.isValueTime(field, settings):
+                if field.is_array and field.array_fixed_length < 0:
+                    if not isLengthDeclared:
+                        deserializers.append("ulong length = message.GetVarULong();")
+                        isLengthDeclared = True
+                    else:
+                        deserializers.append("length = message.GetVarULong();")
+                deserializers.extend(self.generateValueTimeDeserializer(field, pooling))
+            elif field.is_array:
+                if self.isPlainArray(field, settings):
+                    if not isLengthDeclared:
+                        deserializers.append("ulong length = message.GetVarULong();")
+                        isLengthDeclared = True
+                    else:
+                        deserializers.append("length = message.GetVarULong();")
+
+                    # the array of the last deserialization is reused if the length did not change
+                    deserializers.append("if (this.{} == null || this.{}.Length != (int)length) {{".format(
+                        self.sanitizeFieldName(field.field_name), self.sanitizeFieldName(field.field_name)))
+                    deserializers.append("    this.{} = new {}[length];".format(self.sanitizeFieldName(field.field_name),
+                                                                           PRIMITIVE_TYPE_MAP[field.field_type]))
+                    deserializers.append("}")
+                    deserializers.append("message.{}s((int)length, this.{});".format(
+                        PRIMITIVE_DESERIALISATION_MAP[field.field_type], self.sanitizeFieldName(field.field_name)))
+                elif field.array_fixed_length < 0 and pooling:
+                    if not isLengthDeclared:
+                        deserializers.append("ulong length = message.GetVarULong();")
+                        isLengthDeclared = True
+                    else:
+                        deserializers.append("length = message.GetVarULong();")
+                    deserializers.extend(self.generatePooledListDeserializer(message, field, messageDB, settings))
+                elif field.array_fixed_length < 0:
                     # dynamic length array
                     if field.field_type in PRIMITIVE_DESERIALISATION_MAP:
                         deserializers.append("this.{} = new List<{}>(message.{}s());".format(self.sanitizeFieldName(field.field_name),
@@ -430,6 +576,8 @@ class CodeGenerator:
                         deserializers.append("    value.deserializeFromMessage(message);")
                         deserializers.append("    this.{}.Add(value);".format(self.sanitizeFieldName(field.field_name)))
                         deserializers.append("}")
+                elif pooling:
+                    deserializers.extend(self.generatePooledArrayDeserializer(message, field, messageDB, settings))
                 else:
                     #fixed size array
                     if field.field_type in PRIMITIVE_DESERIALISATION_MAP:
@@ -465,6 +613,8 @@ class CodeGenerator:
                         deserializers.append("    value.deserializeFromMessage(message);")
                         deserializers.append("    this.{}[i] = value;".format(self.sanitizeFieldName(field.field_name)))
                         deserializers.append("}")
+            elif pooling and field.field_type not in PRIMITIVE_DESERIALISATION_MAP:
+                deserializers.extend(self.generatePooledValueDeserializer(message, field, messageDB, settings))
             else:
                 if field.field_type in PRIMITIVE_DESERIALISATION_MAP:
                     deserializers.append("this.{} = message.{}();".format(self.sanitizeFieldName(field.field_name), PRIMITIVE_DESERIALISATION_MAP[field.field_type]))
@@ -480,31 +630,346 @@ class CodeGenerator:
 
         return "\n            ".join(deserializers)
 
-    def checkPackage(self, path):
-        if not exists(path):
-            makedirs(path)
+    def generateValueTimeSerializer(self, field: FieldData) -> List[str]:
+        name = self.sanitizeFieldName(field.field_name)
+        adder = TIME_STRUCT_MAP[field.field_type][2]
+        if not field.is_array:
+            return ["message.{}(this.{}.secs);".format(adder, name),
+                    "message.{}(this.{}.nsecs);".format(adder, name)]
+
+        serializers = []
+        if field.array_fixed_length < 0:
+            serializers.append("message.AddVarULong((ulong)this.{}.Count);".format(name))
+            serializers.append("for (int i = 0; i < this.{}.Count; i++) {{".format(name))
+        else:
+            serializers.append("for (int i = 0; i < {}; i++) {{".format(field.array_fixed_length))
+        serializers.append("    message.{}(this.{}[i].secs);".format(adder, name))
+        serializers.append("    message.{}(this.{}[i].nsecs);".format(adder, name))
+        serializers.append("}")
+        return serializers
+
+    def generateValueTimeDeserializer(self, field: FieldData, pooling: bool) -> List[str]:
+        """
+        :param pooling: whether lists and arrays are reused
+        :return: the lines deserializing a RosTime or RosDuration field, dynamic length arrays of the length read into
+            length
+        """
+        name = self.sanitizeFieldName(field.field_name)
+        type, getter, adder = TIME_STRUCT_MAP[field.field_type]
+        value = "new {}(message.{}(), message.{}())".format(type, getter, getter)
+        if not field.is_array:
+            return ["this.{} = {};".format(name, value)]
+
+        deserializers = []
+        if field.array_fixed_length < 0:
+            if pooling:
+                deserializers.append("if (this.{} == null) {{".format(name))
+                deserializers.append("    this.{} = new List<{}>((int)length);".format(name, type))
+                deserializers.append("} else {")
+                deserializers.append("    this.{}.Clear();".format(name))
+                deserializers.append("}")
+            else:
+                deserializers.append("this.{} = new List<{}>((int)length);".format(name, type))
+            deserializers.append("for (int i = 0; i < (int)length; i++) {")
+            deserializers.append("    this.{}.Add({});".format(name, value))
+            deserializers.append("}")
+        else:
+            if pooling:
+                deserializers.append("if (this.{} == null) {{".format(name))
+                deserializers.append("    this.{} = new {}[{}];".format(name, type, field.array_fixed_length))
+                deserializers.append("}")
+            else:
+                deserializers.append("this.{} = new {}[{}];".format(name, type, field.array_fixed_length))
+            deserializers.append("for (int i = 0; i < {}; i++) {{".format(field.array_fixed_length))
+            deserializers.append("    this.{}[i] = {};".format(name, value))
+            deserializers.append("}")
+        return deserializers
+
+    def generatePooledValueDeserializer(self, message: MessageData, field: FieldData,
+                                        messageDB: Dict[str, MessageData], settings: Dict) -> List[str]:
+        """
+        :return: the lines deserializing a time, duration or nested message field into its current value
+        """
+        name = self.sanitizeFieldName(field.field_name)
+        if field.field_type in ['time', 'duration']:
+            getter = "GetUInt" if field.field_type == 'time' else "GetInt"
+            return ["if (this.{} == null) {{".format(name),
+                    "    this.{} = new {}[2];".format(name, "uint" if field.field_type == 'time' else "int"),
+                    "}",
+                    "this.{}[0] = message.{}();".format(name, getter),
+                    "this.{}[1] = message.{}();".format(name, getter)]
+
+        type = self.determineAlias(self.getMessageFromType(message, field.field_type, messageDB), settings)
+        return ["this.{} = {}.DeserializeInto(message, this.{});".format(name, type, name)]
+
+    def generatePooledListDeserializer(self, message: MessageData, field: FieldData,
+                                       messageDB: Dict[str, MessageData], settings: Dict) -> List[str]:
+        """
+        :return: the lines deserializing a dynamic length array of the length read into length, the list and its
+            elements are reused
+        """
+        name = self.sanitizeFieldName(field.field_name)
+        if field.field_type in PRIMITIVE_DESERIALISATION_MAP:
+            return ["if (this.{} == null) {{".format(name),
+                    "    this.{} = new List<{}>((int)length);".format(name, PRIMITIVE_TYPE_MAP[field.field_type]),
+                    "} else {",
+                    "    this.{}.Clear();".format(name),
+                    "}",
+                    "for (int i = 0; i < (int)length; i++) {",
+                    "    this.{}.Add(message.{}());".format(name, PRIMITIVE_DESERIALISATION_MAP[field.field_type]),
+                    "}"]
+
+        if field.field_type in ['time', 'duration']:
+            type = PRIMITIVE_TYPE_MAP[field.field_type]
+            getter = "GetUInt" if field.field_type == 'time' else "GetInt"
+            return ["if (this.{} == null) {{".format(name),
+                    "    this.{} = new List<{}>((int)length);".format(name, type),
+                    "}} else if (this.{}.Count > (int)length) {{".format(name),
+                    "    this.{}.RemoveRange((int)length, this.{}.Count - (int)length);".format(name, name),
+                    "}",
+                    "for (int i = 0; i < (int)length; i++) {",
+                    "    if (i == this.{}.Count) {{".format(name),
+                    "        this.{}.Add(new {}[2]);".format(name, type[:-2]),
+                    "    }",
+                    "    this.{}[i][0] = message.{}();".format(name, getter),
+                    "    this.{}[i][1] = message.{}();".format(name, getter),
+                    "}"]
+
+        type = self.determineAlias(self.getMessageFromType(message, field.field_type, messageDB), settings)
+        return ["if (this.{} == null) {{".format(name),
+                "    this.{} = new List<{}>((int)length);".format(name, type),
+                "} else {",
+                "    // surplus elements go back to the pool",
+                "    for (int i = this.{}.Count - 1; i >= (int)length; i--) {{".format(name),
+                "        {}.Return(this.{}[i]);".format(type, name),
+                "        this.{}.RemoveAt(i);".format(name),
+                "    }",
+                "}",
+                "for (int i = 0; i < (int)length; i++) {",
+                "    if (i < this.{}.Count) {{".format(name),
+                "        this.{}[i] = {}.DeserializeInto(message, this.{}[i]);".format(name, type, name),
+                "    } else {",
+                "        this.{}.Add({}.Rent(message));".format(name, type),
+                "    }",
+                "}"]
+
+    def generatePooledArrayDeserializer(self, message: MessageData, field: FieldData,
+                                        messageDB: Dict[str, MessageData], settings: Dict) -> List[str]:
+        """
+        :return: the lines deserializing a fixed length array into the current array and its elements
+        """
+        name = self.sanitizeFieldName(field.field_name)
+        length = field.array_fixed_length
+        if field.field_type in PRIMITIVE_DESERIALISATION_MAP:
+            return ["if (this.{} == null) {{".format(name),
+                    "    this.{} = new {}[{}];".format(name, PRIMITIVE_TYPE_MAP[field.field_type], length),
+                    "}",
+                    "message.{}s({}, this.{});".format(PRIMITIVE_DESERIALISATION_MAP[field.field_type], length, name)]
+
+        if field.field_type in ['time', 'duration']:
+            type = PRIMITIVE_TYPE_MAP[field.field_type][:-2]
+            getter = "GetUInt" if field.field_type == 'time' else "GetInt"
+            return ["if (this.{} == null) {{".format(name),
+                    "    this.{} = new {}[{}][];".format(name, type, length),
+                    "}",
+                    "for (int i = 0; i < {}; i++) {{".format(length),
+                    "    if (this.{}[i] == null) {{".format(name),
+                    "        this.{}[i] = new {}[2];".format(name, type),
+                    "    }",
+                    "    this.{}[i][0] = message.{}();".format(name, getter),
+                    "    this.{}[i][1] = message.{}();".format(name, getter),
+                    "}"]
+
+        type = self.determineAlias(self.getMessageFromType(message, field.field_type, messageDB), settings)
+        return ["if (this.{} == null) {{".format(name),
+                "    this.{} = new {}[{}];".format(name, type, length),
+                "}",
+                "for (int i = 0; i < {}; i++) {{".format(length),
+                "    this.{}[i] = {}.DeserializeInto(message, this.{}[i]);".format(name, type, name),
+                "}"]
+
+    def generatePooling(self, message: MessageData, messageDB: Dict[str, MessageData], settings: Dict) -> str:
+        """
+        :return: the pool of message and its Reset method if pooling is enabled, otherwise an empty string
+        """
+        if not settings.get('pooling', False):
+            return ""
+
+        reset = []
+        for field in message.fields:
+            if field.constant_value is not None:
+                continue
+            name = self.sanitizeFieldName(field.field_name)
+
+            if self.isValueTime(field, settings):
+                if not field.is_array:
+                    reset.append("this.{} = default;".format(name))
+                elif field.array_fixed_length < 0:
+                    reset.append("if (this.{} != null) {{".format(name))
+                    reset.append("    this.{}.Clear();".format(name))
+                    reset.append("}")
+                else:
+                    reset.append("if (this.{} != null) {{".format(name))
+                    reset.append("    Array.Clear(this.{}, 0, this.{}.Length);".format(name, name))
+                    reset.append("}")
+            elif field.is_array and self.isPlainArray(field, settings):
+                # the array is kept for the next deserialization of the same length
+                reset.append("if (this.{} != null) {{".format(name))
+                reset.append("    Array.Clear(this.{}, 0, this.{}.Length);".format(name, name))
+                reset.append("}")
+            elif field.is_array and field.array_fixed_length < 0:
+                if field.field_type not in PRIMITIVE_TYPE_MAP:
+                    type = self.determineAlias(self.getMessageFromType(message, field.field_type, messageDB), settings)
+                    reset.append("if (this.{} != null) {{".format(name))
+                    reset.append("    foreach ({} value in this.{}) {{".format(type, name))
+                    reset.append("        {}.Return(value);".format(type))
+                    reset.append("    }")
+                    reset.append("    this.{}.Clear();".format(name))
+                    reset.append("}")
+                else:
+                    # the capacity is kept for the next deserialization
+                    reset.append("if (this.{} != null) {{".format(name))
+                    reset.append("    this.{}.Clear();".format(name))
+                    reset.append("}")
+            elif field.is_array:
+                if field.field_type in PRIMITIVE_DESERIALISATION_MAP:
+                    reset.append("if (this.{} != null) {{".format(name))
+                    reset.append("    Array.Clear(this.{}, 0, this.{}.Length);".format(name, name))
+                    reset.append("}")
+                elif field.field_type in ['time', 'duration']:
+                    reset.append("if (this.{} != null) {{".format(name))
+                    reset.append("    foreach ({} value in this.{}) {{".format(PRIMITIVE_TYPE_MAP[field.field_type], name))
+                    reset.append("        if (value != null) {")
+                    reset.append("            value[0] = 0;")
+                    reset.append("            value[1] = 0;")
+                    reset.append("        }")
+                    reset.append("    }")
+                    reset.append("}")
+                else:
+                    type = self.determineAlias(self.getMessageFromType(message, field.field_type, messageDB), settings)
+                    reset.append("if (this.{} != null) {{".format(name))
+                    reset.append("    foreach ({} value in this.{}) {{".format(type, name))
+                    reset.append("        if (value != null) {")
+                    reset.append("            value.Reset();")
+                    reset.append("        }")
+                    reset.append("    }")
+                    reset.append("}")
+            elif field.field_type in PRIMITIVE_DESERIALISATION_MAP:
+                reset.append("this.{} = {}{};".format(name, PRIMITIVE_DEFAULT_VALUE_MAP[field.field_type],
+                                                      PRIMITIVE_SUFFIX_MAP[field.field_type]))
+            elif field.field_type in ['time', 'duration']:
+                reset.append("if (this.{} != null) {{".format(name))
+                reset.append("    this.{}[0] = 0;".format(name))
+                reset.append("    this.{}[1] = 0;".format(name))
+                reset.append("}")
+            else:
+                reset.append("if (this.{} != null) {{".format(name))
+                reset.append("    this.{}.Reset();".format(name))
+                reset.append("}")
+
+        return self.poolTemplate.substitute({
+            "class_name": self.determineClassName(message, settings),
+            "reset": "\n            ".join(reset),
+        })
+
+    def openManifest(self, base_path: str, messageDB: Dict[str, MessageData], settings: Dict):
+        """
+        Enables incremental generation if it is enabled in the settings, unchanged messages are skipped
+        """
+        templates = [self.dependencyTemplate, self.constantTemplate, self.fieldTemplate, self.constructorTemplate,
+                     self.poolTemplate, self.timeTemplate, self.messageTemplate]
+        self.manifest = openManifest(base_path + "/unity", "riptide/{}".format(RIPTIDE_GENERATOR_VERSION), messageDB,
+                                     settings, hashTemplates(template.template for template in templates))
+
+    def checkPackage(self, path, sink: OutputSink):
+        sink.ensureDirectory(path)
+
+    def writeOutFiles(self, base_path: str, settings: Dict, sink: Optional[OutputSink] = None):
+        """
+        Writes all generated files
+
+        :param sink: the sink to write through, a sink of its own is used if None
+        """
+        ownSink = sink is None
+        if ownSink:
+            sink = OutputSink()
+
+        try:
+            for msgID in self.generated_messages:
+                source, message = self.generated_messages[msgID]
 
-    def writeOutFiles(self, base_path: str, settings: Dict):
-        for msgID in self.generated_messages:
-            source, message = self.generated_messages[msgID]
+                messagePath = base_path + "/unity"
+                sink.ensureDirectory(messagePath)
 
-            messagePath = base_path + "/unity"
+                basePackage = settings['namespace'].split('.')
 
-            if not exists(messagePath):
-                makedirs(messagePath)
+                for package in basePackage:
+                    messagePath += '/' + package
+                    self.checkPackage(messagePath, sink)
 
-            basePackage = settings['namespace'].split('.')
+                for package in message.package:
+                    messagePath += '/' + package
+                    self.checkPackage(messagePath, sink)
 
-            for package in basePackage:
-                messagePath += '/' + package
-                self.checkPackage(messagePath)
+                filePath = "{}/{}.cs".format(messagePath, message.name)
+                sink.write(filePath, source)
 
-            for package in message.package:
-                messagePath += '/' + package
-                self.checkPackage(messagePath)
+                if self.manifest is not None:
+                    self.manifest.update(message, self.messageHashes[msgID], filePath)
 
-            writeFile("{}/{}.cs".format(messagePath, message.name), source)
+            if settings.get('value_time', False):
+                self.writeTimeTypes(base_path, settings, sink)
+
+            sink.flush()
+        finally:
+            if ownSink:
+                sink.close()
+
+        if self.manifest is not None:
+            self.manifest.save()
+
+    def getSupportNamespace(self, settings: Dict) -> str:
+        """
+        :return: the namespace of the types shared by all messages, the base namespace of the messages
+        """
+        if settings['namespace'] is not None and settings['namespace'] != '':
+            return settings['namespace']
+        return SUPPORT_NAMESPACE
+
+    def writeTimeTypes(self, base_path: str, settings: Dict, sink: OutputSink):
+        timePath = base_path + "/unity"
+        sink.ensureDirectory(timePath)
+
+        for package in self.getSupportNamespace(settings).split('.'):
+            timePath += '/' + package
+            self.checkPackage(timePath, sink)
+
+        # without a timestamp, so unchanged content is not rewritten
+        sink.write("{}/RosTime.cs".format(timePath), self.timeTemplate.substitute({
+            "namespace": self.getSupportNamespace(settings),
+        }))
 
     def clear(self):
         self.messages_names.clear()
         self.generated_messages.clear()
+        self.messageHashes.clear()
+
+
+def generateMessages(plugin_basepath: str, messages: List[MessageData], messageDB: Dict[str, MessageData], path: str,
+                     settings: Dict, progress: Optional[GenerationProgress] = None):
+    """
+    Generates and writes the C# sources of the given messages. Does not use Qt, so it can run in a worker process
+
+    :param plugin_basepath: the directory of the plugin, containing the templates
+    :param progress: receives a step per generated message and is checked for cancellation during rendering
+    """
+    if progress is None:
+        progress = GenerationProgress()
+
+    ros_gen = CodeGenerator(plugin_basepath)
+    ros_gen.openManifest(path, messageDB, settings)
+
+    ros_gen.generateFiles(messages, messageDB, settings, settings.get('render_workers', 1), progress)
+
+    progress.checkCancelled()
+    ros_gen.writeOutFiles(path, settings)
@@ -1,9 +1,10 @@
+from functools import partial
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Callable
 
 from PyQt6.QtWidgets import QWidget
 
-from .riptide_gen.generator import CodeGenerator
+from .riptide_gen.generator import generateMessages
 from .riptide_settings_widget import RiptideSettingsWidget
 from pytide_message_generator.dataprovider.message_data import MessageData
 from pytide_message_generator.generator.igenerator import IGenerator
@@ -32,8 +33,8 @@ class RiptideGenerator(IGenerator):
         """
         return self.settingsWidget
 
-    def generateFromWidgetSettings(self, messages: List[MessageData], messageDB: Dict[str, MessageData], path: str, settings: RiptideSettingsWidget):
-        settings_dir = {
+    def getSettingsDict(self, settings: RiptideSettingsWidget) -> Dict:
+        return {
             "namespace": settings.namespace_edit.text(),
             "generation_mode": settings.generation_mode_combo.currentIndex(),
             "flatten_structure": settings.flatten_structure_check.isChecked(),
@@ -41,14 +42,18 @@ class RiptideGenerator(IGenerator):
             "common_base": settings.common_base_check.isChecked(),
             "common_base_namespace": settings.base_namespace_edit.text(),
             "common_base_class": settings.base_class_edit.text(),
+            "plain_arrays": settings.plain_arrays_check.isChecked(),
+            "pooling": settings.pooling_check.isChecked(),
+            "value_time": settings.value_time_check.isChecked(),
+            "incremental": settings.incremental_check.isChecked(),
+            "render_workers": settings.render_workers_spin.value(),
         }
 
-        return self.generateFromDictSettings(messages, messageDB, path, settings_dir)
-
     def generateFromDictSettings(self, messages: List[MessageData], messageDB: Dict[str, MessageData], path: str, settings: Dict):
-        ros_gen = CodeGenerator(PLUGIN_DIRECTORY)
+        generateMessages(PLUGIN_DIRECTORY, messages, messageDB, path, settings)
 
-        for message in messages:
-            ros_gen.generateFile(message, messageDB, settings)
+    def getGenerationFunction(self) -> Callable:
+        return partial(generateMessages, PLUGIN_DIRECTORY)
 
-        ros_gen.writeOutFiles(path, settings)
\ No newline at end of file
+    def supportsProcesses(self) -> bool:
+        return True
\ No newline at end of file
@@ -1,5 +1,5 @@
 from PyQt6 import uic
-from PyQt6.QtWidgets import QWidget, QLineEdit, QComboBox, QCheckBox
+from PyQt6.QtWidgets import QWidget, QLineEdit, QComboBox, QCheckBox, QSpinBox
 
 
 class RiptideSettingsWidget(QWidget):
@@ -16,4 +16,10 @@ class RiptideSettingsWidget(QWidget):
         self.base_namespace_edit: QLineEdit = None
         self.base_class_edit: QLineEdit = None
 
+        self.plain_arrays_check: QCheckBox = None
+        self.pooling_check: QCheckBox = None
+        self.value_time_check: QCheckBox = None
+        self.incremental_check: QCheckBox = None
+        self.render_workers_spin: QSpinBox = None
+
         uic.loadUi(base_path + '/resources/gui/settingsWidget.ui', self)
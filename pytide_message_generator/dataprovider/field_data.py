@@ -1,14 +1,34 @@
+import sys
 from typing import Optional, Union
 
 
 class FieldData:
+    __slots__ = ('field_type', 'field_name', 'is_array', 'array_fixed_length', 'max_array_size', 'constant_value',
+                 'comment', 'line')
+
     def __init__(self, field_type: str, field_name: str,
                  is_array: bool = False, array_fixed_length: int = -1, max_array_size: int = -1,
-                 constant_value: Optional[Union[str, bool, int, float]] = None, comment: str = ""):
-        self.field_type: str = field_type
-        self.field_name: str = field_name
+                 constant_value: Optional[Union[str, bool, int, float]] = None, comment: str = "",
+                 line: int = -1):
+        # Type names, field names and comments repeat across a corpus, interning keeps a single copy of each
+        self.field_type: str = sys.intern(field_type)
+        self.field_name: str = sys.intern(field_name)
         self.is_array: bool = is_array
         self.array_fixed_length: int = array_fixed_length
         self.max_array_size: int = max_array_size
         self.constant_value: Optional[Union[str, bool, int, float]] = constant_value
-        self.comment: str = comment
+        self.comment: str = sys.intern(comment)
+        # Line of the declaration in the source file, -1 if unknown
+        self.line: int = line
+
+    def __getstate__(self):
+        return (self.field_type, self.field_name, self.is_array, self.array_fixed_length, self.max_array_size,
+                self.constant_value, self.comment, self.line)
+
+    def __setstate__(self, state):
+        field_type, field_name, self.is_array, self.array_fixed_length, self.max_array_size, \
+            self.constant_value, comment, self.line = state
+
+        self.field_type = sys.intern(field_type)
+        self.field_name = sys.intern(field_name)
+        self.comment = sys.intern(comment)
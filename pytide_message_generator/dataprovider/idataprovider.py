@@ -1,4 +1,4 @@
-from typing import List, Union, Dict, Any
+from typing import List, Union, Dict, Any, Iterator
 
 from PyQt6.QtWidgets import QWidget
 
@@ -34,4 +34,23 @@ class IDataProvider:
         return []
 
     def loadMessagesFromDictSettings(self, settings: Dict) -> List[MessageData]:
-        return []
\ No newline at end of file
+        return []
+
+    def iterMessages(self, settings: Union[QWidget, Dict[str, Any]]) -> Iterator[MessageData]:
+        """
+        Streams the messages of this data provider, so consumers can process them while they are still loaded
+
+        :param settings: the settings widget of this data provider, or the settings as dictionary
+        :return: iterator over all messages
+        """
+        if isinstance(settings, QWidget):
+            return self.iterMessagesFromWidgetSettings(settings)
+        else:
+            return self.iterMessagesFromDictSettings(settings)
+
+    def iterMessagesFromWidgetSettings(self, settings: QWidget) -> Iterator[MessageData]:
+        # Providers without native streaming support load everything at once
+        return iter(self.loadMessagesFromWidgetSettings(settings))
+
+    def iterMessagesFromDictSettings(self, settings: Dict) -> Iterator[MessageData]:
+        return iter(self.loadMessagesFromDictSettings(settings))
\ No newline at end of file
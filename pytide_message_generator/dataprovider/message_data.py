@@ -1,23 +1,78 @@
-from typing import List
+import sys
+from typing import List, Dict, Sequence, Tuple, Optional
 
 from pytide_message_generator.dataprovider.field_data import FieldData
 
+# All messages of a package share one interned package tuple
+_PACKAGES: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+def internPackage(package: Sequence[str]) -> Tuple[str, ...]:
+    """
+    :param package: the package path of a message
+    :return: the shared, interned tuple for the given package path
+    """
+    key = tuple(package)
+    interned = _PACKAGES.get(key)
+    if interned is None:
+        interned = tuple(sys.intern(p) for p in key)
+        _PACKAGES[interned] = interned
+    return interned
+
 
 class MessageData:
+    __slots__ = ('_package', '_name', '_id', 'fields', 'srv_siblings', 'srv_name', 'srv_index', 'source_path')
 
-    def __init__(self, package: List[str], name: str, fields: List[FieldData],
-                 srv_siblings: List['MessageData'] = None, srv_name: str = None):
-        self.package: List[str] = package
-        self.name: str = name
+    def __init__(self, package: Sequence[str], name: str, fields: List[FieldData],
+                 srv_siblings: List['MessageData'] = None, srv_name: str = None, source_path: Optional[str] = None):
+        self._package: Tuple[str, ...] = internPackage(package)
+        self._name: str = sys.intern(name)
+        self._id: str = self.buildID()
         self.fields: List[FieldData] = fields
 
         self.srv_siblings = srv_siblings
         self.srv_name = srv_name
         self.srv_index = 0
 
+        # File the message was defined in, if loaded from a file
+        self.source_path: Optional[str] = source_path
+
+    @property
+    def package(self) -> Tuple[str, ...]:
+        return self._package
+
+    @package.setter
+    def package(self, package: Sequence[str]):
+        self._package = internPackage(package)
+        self._id = self.buildID()
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @name.setter
+    def name(self, name: str):
+        self._name = sys.intern(name)
+        self._id = self.buildID()
+
     @property
     def isService(self):
         return self.srv_siblings is not None
 
+    def buildID(self) -> str:
+        return sys.intern("/".join([*self._package, self._name]))
+
     def getID (self):
-        return "/".join([*self.package, self.name])
\ No newline at end of file
+        return self._id
+
+    def __getstate__(self):
+        return (self._package, self._name, self.fields, self.srv_siblings, self.srv_name, self.srv_index,
+                self.source_path)
+
+    def __setstate__(self, state):
+        package, name, self.fields, self.srv_siblings, self.srv_name, self.srv_index, \
+            self.source_path = state
+
+        self._package = internPackage(package)
+        self._name = sys.intern(name)
+        self._id = self.buildID()
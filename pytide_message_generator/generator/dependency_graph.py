@@ -0,0 +1,163 @@
+from typing import Dict, List, Iterable, Optional, Set
+
+from pytide_message_generator.dataprovider.message_data import MessageData
+from pytide_message_generator.generator.generation_manifest import PRIMITIVE_TYPES, resolveType
+
+
+class DependencyGraph:
+    """
+    Explicit graph of the message fields referencing other messages, built lazily from a messageDB. All traversals are
+    iterative, so arbitrarily deep dependency chains are supported.
+    """
+
+    def __init__(self, messageDB: Dict[str, MessageData]):
+        self.messageDB: Dict[str, MessageData] = messageDB
+
+        # message ID -> resolved dependencies, in field order without duplicates
+        self.edges: Dict[str, List[MessageData]] = {}
+        # message ID -> referenced types missing in messageDB
+        self.missing: Dict[str, List[str]] = {}
+
+    def getDependencies(self, message: MessageData) -> List[MessageData]:
+        """
+        :return: the messages referenced by the fields of message
+        """
+        dependencies = self.edges.get(message.getID())
+        if dependencies is not None:
+            return dependencies
+
+        dependencies = []
+        seen = set()
+        for field in message.fields:
+            if field.field_type in PRIMITIVE_TYPES:
+                continue
+            dependency = resolveType(message, field.field_type, self.messageDB)
+            if dependency is None:
+                self.missing.setdefault(message.getID(), []).append(field.field_type)
+            elif dependency.getID() not in seen:
+                seen.add(dependency.getID())
+                dependencies.append(dependency)
+
+        self.edges[message.getID()] = dependencies
+        return dependencies
+
+    def closure(self, messages: Iterable[MessageData], exclude: Optional[Set[str]] = None) -> List[MessageData]:
+        """
+        :param exclude: IDs of messages that are neither part of the result nor followed, e.g. already generated ones
+        :return: messages and every message they depend on, directly or transitively, each once
+        """
+        result = []
+        seen = set() if exclude is None else set(exclude)
+        stack = list(reversed(list(messages)))
+        while len(stack) > 0:
+            message = stack.pop()
+            if message.getID() in seen:
+                continue
+            seen.add(message.getID())
+            result.append(message)
+            stack.extend(reversed(self.getDependencies(message)))
+
+        return result
+
+    def components(self, messages: Iterable[MessageData],
+                   exclude: Optional[Set[str]] = None) -> List[List[MessageData]]:
+        """
+        Strongly connected components of the closure of messages (Tarjan's algorithm). Messages that are part of a
+        dependency cycle share a component, all other components hold a single message. Excluded messages are
+        treated as if they had no dependencies and are not part of any component.
+
+        :return: the components, every component after all components it depends on
+        """
+        index: Dict[str, int] = {}
+        lowLink: Dict[str, int] = {}
+        onStack = set()
+        stack: List[MessageData] = []
+        result: List[List[MessageData]] = []
+
+        excluded = set() if exclude is None else exclude
+        for root in self.closure(messages, exclude):
+            if root.getID() in index:
+                continue
+
+            # (message, position of the next dependency to visit)
+            work = [(root, 0)]
+            while len(work) > 0:
+                message, position = work.pop()
+                messageID = message.getID()
+                if position == 0:
+                    index[messageID] = lowLink[messageID] = len(index)
+                    stack.append(message)
+                    onStack.add(messageID)
+
+                dependencies = self.getDependencies(message)
+                descended = False
+                while position < len(dependencies):
+                    dependencyID = dependencies[position].getID()
+                    position += 1
+                    if dependencyID in excluded:
+                        continue
+                    if dependencyID not in index:
+                        work.append((message, position))
+                        work.append((dependencies[position - 1], 0))
+                        descended = True
+                        break
+                    if dependencyID in onStack:
+                        lowLink[messageID] = min(lowLink[messageID], index[dependencyID])
+                if descended:
+                    continue
+
+                if lowLink[messageID] == index[messageID]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        onStack.discard(member.getID())
+                        component.append(member)
+                        if member.getID() == messageID:
+                            break
+                    result.append(component)
+
+                if len(work) > 0:
+                    parentID = work[-1][0].getID()
+                    lowLink[parentID] = min(lowLink[parentID], lowLink[messageID])
+
+        return result
+
+    def findCycles(self, messages: Iterable[MessageData],
+                   exclude: Optional[Set[str]] = None) -> List[List[MessageData]]:
+        """
+        :return: the groups of messages in the closure of messages that depend on each other
+        """
+        cycles = []
+        for component in self.components(messages, exclude):
+            if len(component) > 1 or any(dependency.getID() == component[0].getID()
+                                         for dependency in self.getDependencies(component[0])):
+                cycles.append(component)
+        return cycles
+
+    def levels(self, messages: Iterable[MessageData],
+               exclude: Optional[Set[str]] = None) -> List[List[MessageData]]:
+        """
+        Topological levels of the closure of messages. Messages of level 0 depend on no other message, every other
+        message only depends on messages of lower levels, except for members of the same dependency cycle, which share
+        a level. Messages of the same level are independent of each other. Excluded messages count as level -1.
+
+        :return: the messages per level, starting with level 0
+        """
+        levelOf: Dict[str, int] = {}
+        levels: List[List[MessageData]] = []
+
+        for component in self.components(messages, exclude):
+            memberIDs = set(member.getID() for member in component) if len(component) > 1 else {component[0].getID()}
+            level = 0
+            for member in component:
+                for dependency in self.getDependencies(member):
+                    if dependency.getID() not in memberIDs and dependency.getID() in levelOf:
+                        level = max(level, levelOf[dependency.getID()] + 1)
+
+            for member in component:
+                levelOf[member.getID()] = level
+            while len(levels) <= level:
+                levels.append([])
+            levels[level].extend(component)
+
+        return levels
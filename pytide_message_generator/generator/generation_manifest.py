@@ -0,0 +1,199 @@
+import hashlib
+import json
+import os
+from typing import Dict, Optional, Iterable, Set, List
+
+from pytide_message_generator.dataprovider.message_data import MessageData
+
+# Bump whenever the layout of the manifest changes
+MANIFEST_FORMAT_VERSION = 1
+
+MANIFEST_FILE_NAME = ".generation_manifest.json"
+
+# Settings that do not influence the generated sources
+NON_OUTPUT_SETTINGS = frozenset(["incremental", "render_workers"])
+
+PRIMITIVE_TYPES = frozenset(["bool", "int8", "uint8", "int16", "uint16", "int32", "uint32", "int64", "uint64",
+                             "float32", "float64", "string", "time", "duration"])
+
+
+def hashSettings(settings: Dict) -> str:
+    """
+    :return: hash of all settings that influence the generated sources
+    """
+    relevant = {key: value for key, value in settings.items() if key not in NON_OUTPUT_SETTINGS}
+    return hashlib.sha1(json.dumps(relevant, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def hashTemplates(templates: Iterable[str]) -> str:
+    """
+    :param templates: the sources of all templates a generator uses
+    :return: hash of the templates
+    """
+    digest = hashlib.sha1()
+    for template in templates:
+        digest.update(template.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def resolveType(ownMessage: MessageData, type: str, messageDB: Dict[str, MessageData]) -> Optional[MessageData]:
+    message = messageDB.get(type)
+    if message is None:
+        message = messageDB.get("/".join([*ownMessage.package, type]))
+    return message
+
+
+class StructureHasher:
+    """
+    Computes structural hashes of messages. The hash of a message covers its name, package and fields, the structure
+    of its service siblings and, transitively, the structure of every message it references.
+    """
+
+    def __init__(self, messageDB: Dict[str, MessageData]):
+        self.messageDB: Dict[str, MessageData] = messageDB
+        self.ownHashes: Dict[str, str] = {}
+        self.hashes: Dict[str, str] = {}
+
+    def hashOwnStructure(self, message: MessageData) -> str:
+        ownHash = self.ownHashes.get(message.getID())
+        if ownHash is not None:
+            return ownHash
+
+        parts: List[str] = [message.getID(), str(message.srv_name), str(message.srv_index)]
+        for field in message.fields:
+            parts.append(repr((field.field_type, field.field_name, field.is_array, field.array_fixed_length,
+                               field.max_array_size, field.constant_value, field.comment)))
+        for sibling in message.srv_siblings or []:
+            parts.append(sibling.getID())
+            for field in sibling.fields:
+                parts.append(repr((field.field_type, field.field_name, field.is_array, field.array_fixed_length,
+                                   field.max_array_size, field.constant_value, field.comment)))
+
+        ownHash = hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+        self.ownHashes[message.getID()] = ownHash
+        return ownHash
+
+    def hashStructure(self, message: MessageData) -> str:
+        """
+        :return: the structural hash of the message including all messages it depends on
+        """
+        result = self.hashes.get(message.getID())
+        if result is not None:
+            return result
+
+        # All messages reachable from message, cycles are visited once
+        reachable: Set[str] = {message.getID()}
+        ownHashes = []
+        stack = [message]
+        while len(stack) > 0:
+            current = stack.pop()
+            ownHashes.append(self.hashOwnStructure(current))
+            for field in current.fields:
+                if field.field_type in PRIMITIVE_TYPES:
+                    continue
+                dependency = resolveType(current, field.field_type, self.messageDB)
+                if dependency is None:
+                    ownHashes.append("missing:" + field.field_type)
+                elif dependency.getID() not in reachable:
+                    reachable.add(dependency.getID())
+                    stack.append(dependency)
+
+        ownHashes.sort()
+        result = hashlib.sha1("\n".join(ownHashes).encode("utf-8")).hexdigest()
+        self.hashes[message.getID()] = result
+        return result
+
+
+class GenerationManifest:
+    """
+    Records, per message, the hash of everything its generated file was rendered from, together with the path of the
+    file relative to the output directory. The manifest is stored as hidden JSON file inside the output directory of
+    a generator, messages whose hash is unchanged and whose file still exists are neither rendered nor written again.
+    """
+
+    def __init__(self, outputDirectory: str, generatorID: str, messageDB: Dict[str, MessageData], settings: Dict,
+                 templateHash: str = ""):
+        """
+        :param outputDirectory: the directory the generator writes its files to
+        :param generatorID: name and version of the generator, any change invalidates all entries
+        :param messageDB: all known messages
+        :param settings: the settings of the generator
+        :param templateHash: hash of the templates of the generator, see hashTemplates
+        """
+        self.outputDirectory: str = outputDirectory
+        self.path: str = os.path.join(outputDirectory, MANIFEST_FILE_NAME)
+        self.hasher: StructureHasher = StructureHasher(messageDB)
+        self.contextHash: str = hashlib.sha1("\n".join([generatorID, hashSettings(settings), templateHash])
+                                             .encode("utf-8")).hexdigest()
+
+        # message ID -> (hash, file path relative to the output directory)
+        self.entries: Dict[str, List[str]] = {}
+        self.dirty: bool = False
+
+        self.skipped: int = 0
+
+    def load(self):
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as ex:
+            print("Ignoring unreadable generation manifest '{}': {}".format(self.path, ex))
+            return
+
+        if data.get("version") != MANIFEST_FORMAT_VERSION:
+            return
+        self.entries = data.get("entries", {})
+
+    def computeHash(self, message: MessageData) -> str:
+        """
+        :return: the hash of everything the file of message is rendered from
+        """
+        return hashlib.sha1((self.contextHash + self.hasher.hashStructure(message)).encode("utf-8")).hexdigest()
+
+    def isUpToDate(self, message: MessageData, digest: str) -> bool:
+        """
+        :return: True if the file of message was generated from the same input and still exists
+        """
+        entry = self.entries.get(message.getID())
+        if entry is None or entry[0] != digest:
+            return False
+        if not os.path.isfile(os.path.join(self.outputDirectory, entry[1])):
+            return False
+
+        self.skipped += 1
+        return True
+
+    def update(self, message: MessageData, digest: str, filePath: str):
+        """
+        Records that the file of message was written to filePath
+        """
+        self.entries[message.getID()] = [digest, os.path.relpath(filePath, self.outputDirectory).replace(os.sep, '/')]
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+
+        os.makedirs(self.outputDirectory, exist_ok=True)
+        tempPath = "{}.{}.tmp".format(self.path, os.getpid())
+        with open(tempPath, "w") as f:
+            json.dump({"version": MANIFEST_FORMAT_VERSION, "entries": self.entries}, f, indent=1, sort_keys=True)
+        os.replace(tempPath, self.path)
+
+        self.dirty = False
+
+
+def openManifest(outputDirectory: str, generatorID: str, messageDB: Dict[str, MessageData], settings: Dict,
+                 templateHash: str = "") -> Optional[GenerationManifest]:
+    """
+    :return: the loaded manifest of outputDirectory, or None if incremental generation is disabled in the settings
+    """
+    if not settings.get("incremental", False):
+        return None
+
+    manifest = GenerationManifest(outputDirectory, generatorID, messageDB, settings, templateHash)
+    manifest.load()
+    return manifest
@@ -0,0 +1,251 @@
+import multiprocessing
+import queue
+import threading
+import time
+import traceback
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pytide_message_generator.dataprovider.message_data import MessageData
+
+# Minimal time between two progress reports of a job, in seconds
+PROGRESS_REPORT_INTERVAL = 0.05
+
+# Progress event kinds, see GenerationRunner.poll
+EVENT_TOTAL = "total"
+EVENT_PROGRESS = "progress"
+EVENT_FINISHED = "finished"
+EVENT_FAILED = "failed"
+EVENT_CANCELLED = "cancelled"
+
+
+class GenerationCancelled(Exception):
+    """
+    Raised inside a generation job once the generation was cancelled
+    """
+    pass
+
+
+class GenerationProgress:
+    """
+    Progress reporting and cancellation of a generation. This base class ignores all reports and is never cancelled.
+    """
+
+    def setTotal(self, total: int):
+        """
+        :param total: the number of steps of the generation, usually the number of messages
+        """
+        pass
+
+    def step(self, count: int = 1):
+        pass
+
+    def checkCancelled(self):
+        """
+        Raises GenerationCancelled if the generation was cancelled, generators call this between two messages
+        """
+        pass
+
+
+class QueueProgress(GenerationProgress):
+    """
+    Reports the progress of a job to the runner through a queue, shared between threads or processes
+    """
+
+    def __init__(self, jobIndex: int, events, cancelEvent):
+        self.jobIndex: int = jobIndex
+        self.events = events
+        self.cancelEvent = cancelEvent
+
+        self.done: int = 0
+        self.lastReport: float = 0.0
+
+    def setTotal(self, total: int):
+        self.events.put((self.jobIndex, EVENT_TOTAL, total))
+
+    def step(self, count: int = 1):
+        self.done += count
+
+        now = time.monotonic()
+        if now - self.lastReport >= PROGRESS_REPORT_INTERVAL:
+            self.lastReport = now
+            self.events.put((self.jobIndex, EVENT_PROGRESS, self.done))
+
+    def checkCancelled(self):
+        if self.cancelEvent.is_set():
+            raise GenerationCancelled()
+
+
+# Queue and cancel event of the current worker process, set up once by initializeWorker
+_WORKER_EVENTS = None
+_WORKER_CANCEL_EVENT = None
+
+
+def initializeWorker(events, cancelEvent):
+    global _WORKER_EVENTS, _WORKER_CANCEL_EVENT
+    _WORKER_EVENTS = events
+    _WORKER_CANCEL_EVENT = cancelEvent
+
+
+def runJob(jobIndex: int, function: Callable, messages: List[MessageData], messageDB: Dict[str, MessageData],
+           path: str, settings: Dict, events=None, cancelEvent=None):
+    """
+    Runs a single generation job and reports its outcome, in a worker thread or process
+    """
+    events = _WORKER_EVENTS if events is None else events
+    cancelEvent = _WORKER_CANCEL_EVENT if cancelEvent is None else cancelEvent
+
+    progress = QueueProgress(jobIndex, events, cancelEvent)
+    try:
+        progress.checkCancelled()
+        function(messages, messageDB, path, settings, progress)
+    except GenerationCancelled:
+        events.put((jobIndex, EVENT_CANCELLED, None))
+        return
+    except BaseException:
+        events.put((jobIndex, EVENT_FAILED, traceback.format_exc()))
+        return
+
+    events.put((jobIndex, EVENT_PROGRESS, progress.done))
+    events.put((jobIndex, EVENT_FINISHED, None))
+
+
+class GenerationJob:
+    """
+    Generation of the selected messages by one generator
+    """
+
+    def __init__(self, name: str, function: Callable, settings: Dict, useProcess: bool, mainThread: bool = False):
+        """
+        :param name: name shown for the job
+        :param function: function(messages, messageDB, path, settings, progress) running the generation
+        :param settings: the settings of the generator as dictionary
+        :param useProcess: run the job in a worker process, function and settings have to be picklable
+        :param mainThread: run the job in the thread calling GenerationRunner.start, e.g. if it uses Qt widgets
+        """
+        self.name: str = name
+        self.function: Callable = function
+        self.settings: Dict = settings
+        self.useProcess: bool = useProcess
+        self.mainThread: bool = mainThread
+
+        self.total: int = 0
+        self.done: int = 0
+        self.state: Optional[str] = None
+        self.error: Optional[str] = None
+
+    @property
+    def isDone(self) -> bool:
+        return self.state is not None
+
+
+class GenerationRunner:
+    """
+    Runs generation jobs concurrently, jobs that can run without Qt in worker processes, all others in worker threads.
+    The runner does not block, poll reports the progress of the jobs, except for jobs bound to the main thread, which
+    start runs before it returns.
+    """
+
+    def __init__(self, jobs: List[GenerationJob], messages: List[MessageData], messageDB: Dict[str, MessageData],
+                 path: str):
+        self.jobs: List[GenerationJob] = jobs
+        self.messages: List[MessageData] = messages
+        self.messageDB: Dict[str, MessageData] = messageDB
+        self.path: str = path
+
+        self.threadEvents = queue.Queue()
+        self.threadCancelEvent = threading.Event()
+        self.processEvents = None
+        self.processCancelEvent = None
+
+        self.executors: List[Executor] = []
+        self.futures: List[Tuple[GenerationJob, Future]] = []
+
+    def start(self):
+        mainThreadJobs = [i for i, job in enumerate(self.jobs) if job.mainThread]
+        processJobs = [i for i, job in enumerate(self.jobs) if job.useProcess and not job.mainThread]
+        threadJobs = [i for i, job in enumerate(self.jobs) if not job.useProcess and not job.mainThread]
+
+        if len(processJobs) > 0:
+            # spawn, forking a process running Qt is not safe
+            context = multiprocessing.get_context("spawn")
+            self.processEvents = context.Queue()
+            self.processCancelEvent = context.Event()
+
+            executor = ProcessPoolExecutor(max_workers=len(processJobs), mp_context=context,
+                                           initializer=initializeWorker,
+                                           initargs=(self.processEvents, self.processCancelEvent))
+            self.executors.append(executor)
+            for i in processJobs:
+                job = self.jobs[i]
+                self.futures.append((job, executor.submit(runJob, i, job.function, self.messages, self.messageDB,
+                                                          self.path, job.settings)))
+
+        if len(threadJobs) > 0:
+            executor = ThreadPoolExecutor(max_workers=len(threadJobs))
+            self.executors.append(executor)
+            for i in threadJobs:
+                job = self.jobs[i]
+                self.futures.append((job, executor.submit(runJob, i, job.function, self.messages, self.messageDB,
+                                                          self.path, job.settings, self.threadEvents,
+                                                          self.threadCancelEvent)))
+
+        # after the other jobs are started, so they run meanwhile
+        for i in mainThreadJobs:
+            job = self.jobs[i]
+            runJob(i, job.function, self.messages, self.messageDB, self.path, job.settings, self.threadEvents,
+                   self.threadCancelEvent)
+
+    def cancel(self):
+        self.threadCancelEvent.set()
+        if self.processCancelEvent is not None:
+            self.processCancelEvent.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.threadCancelEvent.is_set()
+
+    def poll(self) -> List[Tuple[int, str, Any]]:
+        """
+        Applies all progress reports received since the last call to the jobs
+
+        :return: the received (job index, event, value) reports
+        """
+        events = []
+        for source in (self.threadEvents, self.processEvents):
+            if source is None:
+                continue
+            while True:
+                try:
+                    events.append(source.get_nowait())
+                except queue.Empty:
+                    break
+
+        for jobIndex, event, value in events:
+            job = self.jobs[jobIndex]
+            if event == EVENT_TOTAL:
+                job.total = value
+            elif event == EVENT_PROGRESS:
+                job.done = value
+            elif event == EVENT_FAILED:
+                job.state = event
+                job.error = value
+            else:
+                job.state = event
+
+        # a worker process that died can not report anything
+        for job, future in self.futures:
+            if not job.isDone and future.done() and future.exception() is not None:
+                job.state = EVENT_FAILED
+                job.error = str(future.exception())
+
+        return events
+
+    @property
+    def isDone(self) -> bool:
+        return all(job.isDone for job in self.jobs)
+
+    def shutdown(self):
+        for executor in self.executors:
+            executor.shutdown(wait=True, cancel_futures=True)
+        self.executors = []
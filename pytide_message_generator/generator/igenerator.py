@@ -1,4 +1,4 @@
-from typing import List, Any, Dict, Union
+from typing import List, Any, Dict, Union, Callable
 
 from PyQt6.QtWidgets import QWidget
 
@@ -24,6 +24,15 @@ class IGenerator:
         """
         return QWidget()
 
+    def getSettingsDict(self, settings: QWidget) -> Dict[str, Any]:
+        """
+        Reads the settings from the settings widget, must be called on the Qt main thread
+
+        :param settings: the widget returned by getUIWidget
+        :return: the settings as dictionary, as accepted by generateFromDictSettings
+        """
+        return {}
+
     def generate(self, messages: List[MessageData], messageDB: Dict[str, MessageData], path: str, settings: Union[QWidget, Dict[str, Any]]):
         if isinstance(settings, QWidget):
             self.generateFromWidgetSettings(messages, messageDB, path, settings)
@@ -34,4 +43,33 @@ class IGenerator:
         pass
 
     def generateFromDictSettings(self, messages: List[MessageData], messageDB: Dict[str, MessageData], path, settings: Dict):
-        pass
\ No newline at end of file
+        pass
+
+    def getGenerationFunction(self) -> Callable:
+        """
+        :return: function(messages, messageDB, path, settings, progress) generating the messages with dictionary
+            settings, see GenerationProgress. The default runs generate without progress reports, with the settings
+            widget if usesWidgetSettings
+        """
+        def generate(messages, messageDB, path, settings, progress):
+            if self.usesWidgetSettings():
+                self.generate(messages, messageDB, path, self.getUIWidget())
+            else:
+                self.generate(messages, messageDB, path, settings)
+
+        return generate
+
+    def usesWidgetSettings(self) -> bool:
+        """
+        :return: True if the generator overrides neither getSettingsDict nor getGenerationFunction. It then generates
+            from its settings widget and has to run on the Qt main thread
+        """
+        return type(self).getSettingsDict is IGenerator.getSettingsDict \
+            and type(self).getGenerationFunction is IGenerator.getGenerationFunction
+
+    def supportsProcesses(self) -> bool:
+        """
+        :return: True if the function returned by getGenerationFunction is picklable and does not use Qt, so the
+            generation can run in a worker process
+        """
+        return False
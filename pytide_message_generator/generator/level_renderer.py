@@ -0,0 +1,92 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from pytide_message_generator.dataprovider.message_data import MessageData
+from pytide_message_generator.generator.generation_runner import GenerationProgress
+
+# Levels with fewer messages are rendered in the calling process, starting workers does not pay off for them
+PARALLEL_RENDER_MIN_MESSAGES = 256
+
+# Number of chunks per worker a level is split into, more chunks balance better but cost more round trips
+PARALLEL_RENDER_CHUNKS_PER_WORKER = 4
+
+# Generator, messageDB and settings of the current render worker process, set up once by initializeRenderWorker
+_RENDER_GENERATOR = None
+_RENDER_DB: Optional[Dict[str, MessageData]] = None
+_RENDER_SETTINGS: Optional[Dict] = None
+
+
+def initializeRenderWorker(generatorFactory: Callable, messageDB: Dict[str, MessageData], settings: Dict):
+    global _RENDER_GENERATOR, _RENDER_DB, _RENDER_SETTINGS
+    _RENDER_GENERATOR = generatorFactory()
+    _RENDER_DB = messageDB
+    _RENDER_SETTINGS = settings
+
+
+def renderChunk(messageIDs: List[str]) -> List[Tuple[str, str]]:
+    """
+    Renders the messages with the given IDs in a render worker process
+
+    :return: (message ID, source) per message
+    """
+    return [(messageID, _RENDER_GENERATOR.renderFile(_RENDER_DB[messageID], _RENDER_DB, _RENDER_SETTINGS))
+            for messageID in messageIDs]
+
+
+def renderLevels(levels: List[List[MessageData]], renderFile: Callable[[MessageData], str],
+                 generatorFactory: Callable, messageDB: Dict[str, MessageData], settings: Dict, workers: int = 1,
+                 progress: Optional[GenerationProgress] = None) -> Iterator[Tuple[MessageData, str]]:
+    """
+    Renders messages level by level, a level only once all lower levels are rendered. The messages of a level are
+    independent of each other, large levels are split among worker processes.
+
+    :param levels: the messages to render per level, see DependencyGraph.levels
+    :param renderFile: renders a message in the calling process
+    :param generatorFactory: picklable callable creating the generator of a worker process, the generator has to provide
+        renderFile(message, messageDB, settings)
+    :param workers: maximal number of worker processes, 1 renders everything in the calling process
+    :param progress: receives a step per rendered message and is checked for cancellation between chunks
+    :return: (message, source) per message, in level order
+    """
+    if progress is None:
+        progress = GenerationProgress()
+
+    pool: Optional[ProcessPoolExecutor] = None
+    try:
+        for level in levels:
+            progress.checkCancelled()
+
+            if workers <= 1 or len(level) < PARALLEL_RENDER_MIN_MESSAGES:
+                for message in level:
+                    yield message, renderFile(message)
+                    progress.step()
+                continue
+
+            if pool is None:
+                # spawn, the caller might run Qt
+                pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                           initializer=initializeRenderWorker,
+                                           initargs=(generatorFactory, messageDB, settings))
+
+            # messages of a level might not be part of messageDB under their ID, these are rendered here
+            remote = [message for message in level if messageDB.get(message.getID()) is message]
+            local = [message for message in level if messageDB.get(message.getID()) is not message]
+            levelMessages = {message.getID(): message for message in remote}
+
+            chunkSize = max(1, -(-len(remote) // (workers * PARALLEL_RENDER_CHUNKS_PER_WORKER)))
+            chunks = [[message.getID() for message in remote[i:i + chunkSize]]
+                      for i in range(0, len(remote), chunkSize)]
+
+            for results in pool.map(renderChunk, chunks):
+                progress.checkCancelled()
+                for messageID, source in results:
+                    yield levelMessages[messageID], source
+                progress.step(len(results))
+
+            for message in local:
+                yield message, renderFile(message)
+                progress.step()
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,37 @@
+import os
+import threading
+from string import Template
+from typing import Dict, Tuple
+
+from pytide_message_generator.io.filewriter import readFile
+
+# absolute path -> (mtime_ns, size, template), shared by all generators of the process
+_TEMPLATES: Dict[str, Tuple[int, int, Template]] = {}
+_TEMPLATES_LOCK = threading.Lock()
+
+
+def getTemplate(path: str) -> Template:
+    """
+    Returns the template stored at path. Each template file is read once per process and only read again after it
+    was modified.
+
+    :param path: path of the template file
+    :return: the template
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+
+    with _TEMPLATES_LOCK:
+        entry = _TEMPLATES.get(path)
+    if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+        return entry[2]
+
+    template = Template(readFile(path))
+    with _TEMPLATES_LOCK:
+        _TEMPLATES[path] = (stat.st_mtime_ns, stat.st_size, template)
+    return template
+
+
+def clearTemplateCache():
+    with _TEMPLATES_LOCK:
+        _TEMPLATES.clear()
@@ -1,10 +1,18 @@
-from typing import Tuple, Callable, Dict, List
+import re
+from bisect import bisect_left
+from typing import Tuple, Callable, Dict, List, FrozenSet, Iterable, Optional, Pattern, Match
 
 DECIMAL_POINT: str = '.'
 
 DECIMAL_DIGITS = ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9']
 HEXADECIMAL_DIGITS = ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9', 'a', 'b', 'c', 'd', 'e', 'f']
 
+DECIMAL_DIGIT_SET: FrozenSet[str] = frozenset(DECIMAL_DIGITS)
+DECIMAL_DIGIT_VALUES: Dict[str, int] = {c: i for i, c in enumerate(DECIMAL_DIGITS)}
+HEXADECIMAL_DIGIT_VALUES: Dict[str, int] = {c: i for i, c in enumerate(HEXADECIMAL_DIGITS)}
+
+DEFAULT_SKIP_CHARACTERS: FrozenSet[str] = frozenset([' ', '\t'])
+
 ESCAPE_SEQUENCES = {
     '"': '"',
     '\\': '\\',
@@ -16,6 +24,63 @@ ESCAPE_SEQUENCES = {
     't': '\t',
 }
 
+WHITESPACE_PATTERN: Pattern = re.compile(r'\s*')
+NON_WHITESPACE_PATTERN: Pattern = re.compile(r'\S*')
+DECIMAL_DIGITS_PATTERN: Pattern = re.compile(r'[0-9]*')
+FLOAT_DIGITS_PATTERN: Pattern = re.compile(r'[0-9.]*')
+STRING_LITERAL_CHUNK_PATTERN: Pattern = re.compile(r'[^"\\]*')
+
+_CHARACTER_RUN_PATTERNS: Dict[FrozenSet[str], Tuple[Pattern, Pattern]] = {}
+
+
+def getCharacterRunPatterns(chars: Iterable[str]) -> Tuple[Pattern, Pattern]:
+    """
+    Returns the (cached) compiled patterns matching a run of the given characters and a run of any other characters
+
+    :param chars: the characters of the character class, entries longer than one character never match
+    :return: a tuple of (pattern matching the characters, pattern matching everything but the characters)
+    """
+    key = chars if isinstance(chars, frozenset) else frozenset(chars)
+    patterns = _CHARACTER_RUN_PATTERNS.get(key)
+    if patterns is None:
+        charClass = ''.join(re.escape(c) for c in sorted(key) if len(c) == 1)
+        if charClass:
+            patterns = (re.compile('[{}]*'.format(charClass)), re.compile('[^{}]*'.format(charClass)))
+        else:
+            patterns = (re.compile(''), re.compile('.*', re.DOTALL))
+        _CHARACTER_RUN_PATTERNS[key] = patterns
+    return patterns
+
+
+def composeFloat(digits: str, leadingPoint: bool = False, negative: bool = False, exponent: int = 0) -> float:
+    """
+    Assembles the value of a float literal the way AsciiParser.readFloat reads it
+
+    :param digits: the digits of the literal, starting with a digit, may contain decimal points
+    :param leadingPoint: True if the literal started with a decimal point in front of the digits
+    :param negative: True if the literal had a leading '-'
+    :param exponent: the decimal exponent
+    :return: the value of the literal
+    """
+    divisor = 1
+    mul = -1 if negative else 1
+
+    if leadingPoint:
+        fraction = digits
+    else:
+        point = digits.find(DECIMAL_POINT)
+        fraction = digits[point + 1:] if point >= 0 else ''
+
+    if fraction:
+        divisor = 10 ** (len(fraction) - fraction.count(DECIMAL_POINT))
+
+    value = int(digits.replace(DECIMAL_POINT, ''))
+
+    if exponent != 0:
+        mul *= 10**exponent
+
+    return (float(value)/divisor)*mul
+
 
 class AsciiParserException(Exception):
 
@@ -33,87 +98,138 @@ class AsciiParser:
         self.__nextPos: int = 0
         self.data: str = data
 
+        self.__lineOffsets: List[int] = []
+        self.__indexedData: Optional[str] = None
+        self.buildLineIndex()
+
     def loadData(self, data: str):
         self.__nextPos = 0
         self.data = data
+        self.buildLineIndex()
 
     def reset(self):
         self.__nextPos = 0
 
+    def buildLineIndex(self):
+        """
+        Builds the table of newline offsets used to map buffer positions to lines and columns
+        """
+        data = self.data
+        offsets = []
+        pos = data.find('\n')
+        while pos >= 0:
+            offsets.append(pos)
+            pos = data.find('\n', pos + 1)
+
+        self.__lineOffsets = offsets
+        self.__indexedData = data
+
     def getLinePosition(self, position: int = None) -> Tuple[int, int, int]:
         if position is None:
             position = self.__nextPos
 
-        line = 1
-        char = 1
+        if self.__indexedData is not self.data:
+            # data was replaced without loadData
+            self.buildLineIndex()
 
-        for i in range(position):
-            if self.data[i] == '\n':
-                line += 1
-                char = 1
-            else:
-                char += 1
+        # Number of newlines in front of the position
+        line = bisect_left(self.__lineOffsets, position)
+        lineStart = self.__lineOffsets[line - 1] + 1 if line > 0 else 0
 
-        return (line, char, position)
+        return (line + 1, position - lineStart + 1, position)
 
     def available(self) -> bool:
         return self.__nextPos < len(self.data)
 
     def peek(self):
-        if not self.available():
+        pos = self.__nextPos
+        if pos >= len(self.data):
             raise AsciiParserException(self.getLinePosition(), "Unexpected EOF")
-        return self.data[self.__nextPos]
+        return self.data[pos]
 
     def read(self):
-        if not self.available():
+        pos = self.__nextPos
+        if pos >= len(self.data):
             raise AsciiParserException(self.getLinePosition(), "Unexpected EOF")
-        self.__nextPos += 1
-        return self.data[self.__nextPos-1]
+        self.__nextPos = pos + 1
+        return self.data[pos]
 
     def consume(self):
-        if not self.available():
+        if self.__nextPos >= len(self.data):
             raise AsciiParserException(self.getLinePosition(), "Unexpected EOF")
         self.__nextPos += 1
 
     def check(self, c: str):
         if len(c) > 1:
             raise ValueError("Expected single char, but got '{}'. Please use validate(str) instead".format(c))
-        elif c is not self.peek():
+        elif c != self.peek():
             raise AsciiParserException(self.getLinePosition(), "Char {} expected, but got {}".format(c, self.peek()))
 
     def validate(self, expected: str):
+        if self.data.startswith(expected, self.__nextPos):
+            self.__nextPos += len(expected)
+            return
+
+        # Mismatch, walk the expected string to report the offending character
         for c in expected:
-            if c is not self.peek():
+            if c != self.peek():
                 raise AsciiParserException(self.getLinePosition(),
                                            "Char {} expected, but got {}".format(c, self.peek()))
             self.consume()
 
-    def skipWhitespace(self) -> int:
-        whiteSpaces = 0
+    def getPosition(self) -> int:
+        return self.__nextPos
+
+    def setPosition(self, position: int):
+        """
+        Moves the read position, e.g. to backtrack after a speculative read
+        """
+        if position < 0 or position > len(self.data):
+            raise ValueError("Position {} is out of bounds (0 - {})".format(position, len(self.data)))
+        self.__nextPos = position
+
+    def readPattern(self, pattern: Pattern) -> Optional[Match]:
+        """
+        Matches the given precompiled pattern at the current position and consumes the match on success
+
+        :param pattern: compiled regular expression to match
+        :return: the match, or None if the pattern does not match at the current position
+        """
+        match = pattern.match(self.data, self.__nextPos)
+        if match is not None:
+            self.__nextPos = match.end()
+        return match
+
+    def skipPattern(self, pattern: Pattern) -> int:
+        """
+        Skips the span matched by the given pattern, the pattern has to accept the empty string
+
+        :return: the number of skipped characters
+        """
+        pos = self.__nextPos
+        end = pattern.match(self.data, pos).end()
+        self.__nextPos = end
+        return end - pos
 
-        while self.available():
-            c = self.peek()
-            if c.isspace():
-                self.consume()
-                whiteSpaces += 1
-            else:
-                return whiteSpaces
-        return whiteSpaces
+    def readSpan(self, pattern: Pattern) -> str:
+        """
+        Reads the span matched by the given pattern, the pattern has to accept the empty string
+
+        :return: the matched span
+        """
+        pos = self.__nextPos
+        end = pattern.match(self.data, pos).end()
+        self.__nextPos = end
+        return self.data[pos:end]
+
+    def skipWhitespace(self) -> int:
+        return self.skipPattern(WHITESPACE_PATTERN)
 
     def skipCharacters(self, skipChars=None) -> int:
         if skipChars is None:
-            skipChars = [' ', '\t']
+            skipChars = DEFAULT_SKIP_CHARACTERS
 
-        skippedChars = 0
-
-        while self.available():
-            c = self.peek()
-            if c in skipChars:
-                self.consume()
-                skippedChars += 1
-            else:
-                return skippedChars
-        return skippedChars
+        return self.skipPattern(getCharacterRunPatterns(skipChars)[0])
 
     def readHexInteger(self, expectedDigits: int) -> int:
         self.skipWhitespace()
@@ -137,39 +253,20 @@ class AsciiParser:
         return value
 
     def readToWhitespace(self):
-        sb = []
-        while True:
-            c = self.peek()
-            if c.isspace():
-                return ''.join(sb)
-            sb.append(c)
-            self.consume()
-
-            if not self.available():
-                return ''.join(sb)
+        self.peek()
+        return self.readSpan(NON_WHITESPACE_PATTERN)
 
     def readToSeperator(self, seperator: List[str]):
-        sb = []
-        while True:
-            c = self.peek()
-            if c in seperator:
-                return ''.join(sb)
-            sb.append(c)
-            self.consume()
-
-            if not self.available():
-                return ''.join(sb)
+        self.peek()
+        return self.readSpan(getCharacterRunPatterns(seperator)[1])
 
     def readToEndOfLine(self):
-        sb = []
-        while True:
-            if not self.available():
-                return ''.join(sb)
-            c = self.peek()
-            if c == '\n':
-                return ''.join(sb)
-            sb.append(c)
-            self.consume()
+        pos = self.__nextPos
+        end = self.data.find('\n', pos)
+        if end < 0:
+            end = len(self.data)
+        self.__nextPos = end
+        return self.data[pos:end]
 
     def readToEndOfFile(self):
         pos = self.__nextPos
@@ -179,92 +276,55 @@ class AsciiParser:
     def readInteger(self) -> int:
         self.skipWhitespace()
 
-        c = self.peek()
-        if c == '-':
+        negative = self.peek() == '-'
+        if negative:
             self.consume()
             self.skipWhitespace()
-            c = self.read()
-            value = -self.getNumberFromChar(c)
-        else:
-            value = self.getNumberFromChar(c)
-            self.consume()
 
-        while True:
-            if not self.available():
-                return value
-            c = self.peek()
-            if not self.isDigit(c):
-                return value
+        digits = self.readSpan(DECIMAL_DIGITS_PATTERN)
+        if not digits:
+            # No digit at all, report the offending character
+            self.getNumberFromChar(self.read() if negative else self.peek())
 
-            value *= 10
-            value += self.getHexNumberFromChar(c)
-            self.consume()
+        value = int(digits)
+        return -value if negative else value
 
     def readFloat(self) -> float:
-        value = 0
-        divisor = 1
-        mul = 1
-        countDivisor = False
+        negative = False
 
         self.skipWhitespace()
 
-        c = self.peek()
-        if c == '-':
+        if self.peek() == '-':
             self.consume()
             self.skipWhitespace()
-            mul = -1
-            c = self.peek()
+            negative = True
 
-        if c == DECIMAL_POINT:
-            countDivisor = True
+        leadingPoint = self.peek() == DECIMAL_POINT
+        if leadingPoint:
             self.consume()
-            c = self.peek()
 
-        value = self.getNumberFromChar(c)
-        if countDivisor:
-            divisor *= 10
-        self.consume()
+        # The first character has to be a digit, every following one may be a digit or a decimal point
+        self.getNumberFromChar(self.peek())
+        digits = self.readSpan(FLOAT_DIGITS_PATTERN)
 
-        while True:
-            if not self.available():
-                break
-            c = self.peek()
-            if self.isDigit(c):
-                value *= 10
-                value += self.getNumberFromChar(c)
-                self.consume()
-                if countDivisor:
-                    divisor *= 10
-            elif c == DECIMAL_POINT:
-                countDivisor = True
-                self.consume()
-            else:
-                break
-        c = self.peek()
-        if c in ['e', 'E']:
+        exp = 0
+        if self.available() and self.peek() in ['e', 'E']:
             self.consume()
             exp = self.readInteger()
-            mul *= 10**exp
 
-        return (float(value)/divisor)*mul
+        return composeFloat(digits, leadingPoint, negative, exp)
 
     def readBool(self) -> bool:
         self.skipWhitespace()
         c = self.peek()
         pos = self.__nextPos
-        try:
-            if c in ['T', 't']:
-                self.consume()
-                self.validate('rue')
-                return True
-            elif c in ['F', 'f']:
-                self.consume()
-                self.validate('alse')
-                return False
-            else:
-                raise AsciiParserException((0, 0, 0), "")
-        except AsciiParserException as ex:
-            raise AsciiParserException(self.getLinePosition(pos), "Expected boolean value ('True', 'true', 'False' or 'false')")
+        if c in ['T', 't'] and self.data.startswith('rue', pos + 1):
+            self.__nextPos = pos + 4
+            return True
+        elif c in ['F', 'f'] and self.data.startswith('alse', pos + 1):
+            self.__nextPos = pos + 5
+            return False
+        raise AsciiParserException(self.getLinePosition(pos), "Expected boolean value ('True', 'true', 'False' or 'false')")
 
     def readStringLiteral(self) -> str:
         self.skipWhitespace()
@@ -274,47 +334,47 @@ class AsciiParser:
         chars = []
 
         while True:
-            c = self.peek()
+            chunk = self.readSpan(STRING_LITERAL_CHUNK_PATTERN)
+            if chunk:
+                chars.append(chunk)
+
+            c = self.read()
             if c == '"':
-                self.consume()
                 return ''.join(chars)
-            elif c == '\\':
-                self.consume()
-                c = self.read()
-                if c in ESCAPE_SEQUENCES:
-                    chars.append(ESCAPE_SEQUENCES[c])
-                elif c == 'u':
-                    codepoint = self.readHexInteger(4)
-                    chars.append(chr(codepoint))
-                else:
-                    raise AsciiParserException(self.getLinePosition(), "Invalid escape sequence: '\\{}'".format(c))
+
+            # Escape sequence
+            c = self.read()
+            if c in ESCAPE_SEQUENCES:
+                chars.append(ESCAPE_SEQUENCES[c])
+            elif c == 'u':
+                codepoint = self.readHexInteger(4)
+                chars.append(chr(codepoint))
             else:
-                chars.append(c)
-                self.consume()
+                raise AsciiParserException(self.getLinePosition(), "Invalid escape sequence: '\\{}'".format(c))
 
     def isDigit(self, c: str):
         if len(c) > 1:
             raise ValueError("Expected single char, but got '{}' instead".format(c))
-        return c in DECIMAL_DIGITS
+        return c in DECIMAL_DIGIT_SET
 
     def isHexDigit(self, c: str):
         if len(c) > 1:
             raise ValueError("Expected single char, but got '{}' instead".format(c))
-        return c.lower() in HEXADECIMAL_DIGITS
+        return c.lower() in HEXADECIMAL_DIGIT_VALUES
 
     def getNumberFromChar(self, c: str) -> int:
         if len(c) > 1:
             raise ValueError("Expected single char, but got '{}' instead".format(c))
-        elif c in DECIMAL_DIGITS:
-            return DECIMAL_DIGITS.index(c)
-        else:
+        value = DECIMAL_DIGIT_VALUES.get(c)
+        if value is None:
             raise AsciiParserException(self.getLinePosition(), "Expected decimal digit (0 - 9), but got '{}' instead.".format(c))
+        return value
 
     def getHexNumberFromChar(self, c: str) -> int:
         if len(c) > 1:
             raise ValueError("Expected single char, but got '{}' instead".format(c))
-        elif c.lower() in HEXADECIMAL_DIGITS:
-            return HEXADECIMAL_DIGITS.index(c.lower())
-        else:
+        value = HEXADECIMAL_DIGIT_VALUES.get(c.lower())
+        if value is None:
             raise AsciiParserException(self.getLinePosition(),
                                        "Expected hexadecimal digit (0 - f), but got '{}' instead.".format(c))
+        return value
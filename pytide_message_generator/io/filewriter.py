@@ -1,5 +1,11 @@
 import os
 import errno
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import List, Set
+
+# Number of threads writing files in an OutputSink
+OUTPUT_SINK_WORKERS = 8
 
 def writeFile (path, content, mode="w"):
     """
@@ -95,3 +101,103 @@ def readFileBinary(path):
         f.close()
 
     return result
+
+
+class OutputSink:
+    """
+    Writes generated files. Every directory is created at most once, the files are written on a thread pool, files
+    whose content did not change are left untouched and changed files are replaced atomically by writing a temporary
+    file next to them and renaming it.
+
+    Use as context manager, or call close to wait for all pending writes.
+    """
+
+    def __init__(self, workers: int = OUTPUT_SINK_WORKERS):
+        self.createdDirectories: Set[str] = set()
+        self.executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=workers)
+        self.pending: List[Future] = []
+
+        self.lock = threading.Lock()
+        self.written: int = 0
+        self.unchanged: int = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def ensureDirectory(self, path: str) -> bool:
+        """
+        Creates the directory path and all its parents, if they do not exist yet
+
+        :param path: Path of the directory
+        :return: True if the directory was created by this call
+        """
+        if path in self.createdDirectories:
+            return False
+        self.createdDirectories.add(path)
+
+        if os.path.isdir(path):
+            return False
+        os.makedirs(path, exist_ok=True)
+        return True
+
+    def write(self, path: str, content: str):
+        """
+        Queues content to be written to the file at path, the directory of the file is created if needed
+
+        :param path: Path of the file to write
+        :param content: Content to write to the file
+        :return: None
+        """
+        dirname = os.path.dirname(path)
+        if len(dirname.strip()) > 0:
+            self.ensureDirectory(dirname)
+
+        self.pending.append(self.executor.submit(self.writeIfChanged, path, content))
+
+    def writeIfChanged(self, path: str, content: str):
+        mode = None
+        try:
+            with open(path, "r") as f:
+                if f.read() == content:
+                    with self.lock:
+                        self.unchanged += 1
+                    return
+                mode = os.fstat(f.fileno()).st_mode & 0o7777
+        except (OSError, UnicodeDecodeError):
+            pass
+
+        tempPath = "{}.{}.{}.tmp".format(path, os.getpid(), threading.get_ident())
+        try:
+            with open(tempPath, "w") as f:
+                f.write(content)
+            if mode is not None:
+                # keep the permissions of the file that is replaced
+                os.chmod(tempPath, mode)
+            os.replace(tempPath, path)
+        except BaseException:
+            if os.path.exists(tempPath):
+                os.remove(tempPath)
+            raise
+
+        with self.lock:
+            self.written += 1
+
+    def flush(self):
+        """
+        Waits for all queued writes, raises the first error that occurred while writing
+        """
+        pending, self.pending = self.pending, []
+        errors = [future.exception() for future in pending]
+        errors = [error for error in errors if error is not None]
+        if len(errors) > 0:
+            raise errors[0]
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self.executor.shutdown(wait=True)
+
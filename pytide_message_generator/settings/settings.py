@@ -1 +1,10 @@
-COLUMNS_LANGUAGE_LAYOUT = 2
\ No newline at end of file
+COLUMNS_LANGUAGE_LAYOUT = 2
+
+# Number of streamed messages added to the message view at once while loading
+MESSAGE_LOAD_BATCH_SIZE = 500
+
+# Run generators that do not need Qt in worker processes instead of worker threads, rendering is bound by the GIL
+GENERATION_USE_PROCESSES = True
+
+# Interval in milliseconds in which the progress of running generators is polled
+GENERATION_POLL_INTERVAL = 50
@@ -1,19 +1,21 @@
 import sys
 from time import sleep
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from PyQt6 import uic
-from PyQt6.QtCore import QAbstractItemModel, QModelIndex, Qt, QThread, QThreadPool
+from PyQt6.QtCore import QAbstractItemModel, QModelIndex, Qt, QThread, QThreadPool, QTimer
 from PyQt6.QtWidgets import QMainWindow, QComboBox, QGroupBox, QAbstractButton, QToolButton, QCheckBox, QTabWidget, \
-    QLineEdit, QPushButton, QTreeView, QAbstractItemView, QProgressDialog
+    QLineEdit, QPushButton, QTreeView, QAbstractItemView, QProgressDialog, QApplication
 
 from pytide_message_generator.dataprovider.idataprovider import IDataProvider
 from pytide_message_generator.dataprovider.message_data import MessageData
+from pytide_message_generator.generator.generation_runner import GenerationJob, GenerationRunner, EVENT_FAILED
 from pytide_message_generator.generator.igenerator import IGenerator
 from pytide_message_generator.plugin import moduleloader
-from pytide_message_generator.settings.settings import COLUMNS_LANGUAGE_LAYOUT
+from pytide_message_generator.settings.settings import COLUMNS_LANGUAGE_LAYOUT, MESSAGE_LOAD_BATCH_SIZE, \
+    GENERATION_USE_PROCESSES, GENERATION_POLL_INTERVAL
 from pytide_message_generator.tools.ui_interaction_tools import setup_folder_select
-from pytide_message_generator.ui.progress_dialog import ProgressDialog, ProgressRunnable
+from pytide_message_generator.ui.progress_dialog import ProgressDialog
 from pytide_message_generator.widgets.messageView.messagedatarole import DATA_ROLE_MESSAGE_DATA
 from pytide_message_generator.widgets.messageView.messagemodel import MessageModel
 from pytide_message_generator.widgets.messageView.messageview import MessageView
@@ -50,6 +52,8 @@ class MainWindow(QMainWindow):
         self.btn_select_all: QToolButton = None
         self.btn_select_none: QToolButton = None
 
+        self.generationRunner: Optional[GenerationRunner] = None
+
         uic.loadUi('GUI/Windows/mainwindow.ui', self)
 
         setup_folder_select(self.btn_select_outpath, self.line_out_path)
@@ -66,6 +70,13 @@ class MainWindow(QMainWindow):
         self.btn_select_all.clicked.connect(self.onSelectAll)
         self.btn_select_none.clicked.connect(self.onDeselectAll)
 
+        self.progressDialog = ProgressDialog(self)
+        self.progressDialog.cancelRequested.connect(self.onCancelGenerate)
+
+        self.generationTimer = QTimer(self)
+        self.generationTimer.setInterval(GENERATION_POLL_INTERVAL)
+        self.generationTimer.timeout.connect(self.onGenerationProgress)
+
 
     def setupMessageView(self):
         model = MessageModel(0, 1, self)
@@ -82,29 +93,93 @@ class MainWindow(QMainWindow):
     def onLoadData(self):
         currentDataProviderName: str = self.combo_data_source.currentText()
         dataProvider = self.DATA_PROVIDERS[currentDataProviderName]
-        messages = dataProvider.loadMessages(dataProvider.getUIWidget())
 
-        for msg in messages:
-            print(msg.getID())
-            self.messageDB[msg.getID()] = msg
+        try:
+            self.btn_load_data.setEnabled(False)
+
+            # Show messages while the provider is still loading, in batches to keep the model updates cheap
+            batch: List[MessageData] = []
+            for msg in dataProvider.iterMessages(dataProvider.getUIWidget()):
+                print(msg.getID())
+                self.messageDB[msg.getID()] = msg
+                batch.append(msg)
+
+                if len(batch) >= MESSAGE_LOAD_BATCH_SIZE:
+                    self.messageModel.addMessages(batch)
+                    batch = []
+                    QApplication.processEvents()
 
-        self.messageModel.addMessages(messages)
+            self.messageModel.addMessages(batch)
+        except Exception as ex:
+            import traceback
+            print(ex)
+            traceback.print_exception(ex)
+        finally:
+            self.btn_load_data.setEnabled(True)
 
     def onGenerate(self):
+        if self.generationRunner is not None:
+            return
+
         try:
             self.btn_generate.setEnabled(False)
 
             messageData: List[MessageData] = self.getSelectedMessages()
 
+            # Settings are read from the widgets here, the jobs run outside the Qt main thread
+            jobs: List[GenerationJob] = []
             for generator in self.GENERATORS.values():
                 if generator.enabled:
-                    generator.generate(messageData, self.messageDB, self.line_out_path.text(), generator.getUIWidget())
+                    jobs.append(GenerationJob(generator.getLanguage(), generator.getGenerationFunction(),
+                                              generator.getSettingsDict(generator.getUIWidget()),
+                                              GENERATION_USE_PROCESSES and generator.supportsProcesses(),
+                                              generator.usesWidgetSettings()))
+
+            if len(jobs) == 0:
+                self.btn_generate.setEnabled(True)
+                return
+
+            self.generationRunner = GenerationRunner(jobs, messageData, self.messageDB, self.line_out_path.text())
+            self.generationRunner.start()
         except Exception as ex:
             import traceback
             print(ex)
             traceback.print_exception(ex)
-        finally:
-            self.btn_generate.setEnabled(True)
+            self.finishGenerate()
+            return
+
+        self.progressDialog.start(jobs, len(messageData))
+        self.generationTimer.start()
+
+    def onGenerationProgress(self):
+        runner = self.generationRunner
+        if runner is None:
+            return
+
+        runner.poll()
+        self.progressDialog.updateJobs(runner.jobs)
+
+        if runner.isDone:
+            for job in runner.jobs:
+                if job.state == EVENT_FAILED:
+                    print("Generation of {} failed:".format(job.name))
+                    print(job.error)
+                else:
+                    print("Generation of {} {}".format(job.name, job.state))
+            self.finishGenerate()
+
+    def onCancelGenerate(self):
+        if self.generationRunner is not None:
+            self.generationRunner.cancel()
+
+    def finishGenerate(self):
+        self.generationTimer.stop()
+        if self.generationRunner is not None:
+            self.generationRunner.shutdown()
+            self.generationRunner = None
+
+        self.progressDialog.finish()
+        self.btn_generate.setEnabled(True)
 
 
     def getSelectedMessages(self):
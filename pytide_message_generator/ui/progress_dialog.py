@@ -1,29 +1,67 @@
-from PyQt6 import uic
-from PyQt6.QtCore import QRunnable
-from PyQt6.QtWidgets import QDialog, QProgressBar
+from typing import List
 
-class ProgressRunnable(QRunnable):
+from PyQt6 import uic
+from PyQt6.QtCore import pyqtSignal
+from PyQt6.QtWidgets import QDialog, QProgressBar, QDialogButtonBox, QLabel
 
-    def __init__(self):
-        super(ProgressRunnable, self).__init__()
-        self.dialog = ProgressDialog()
+from pytide_message_generator.generator.generation_runner import GenerationJob
 
-    def run(self):
-        self.dialog.exec()
 
 class ProgressDialog(QDialog):
+    """
+    Shows the progress of running generation jobs. The dialog does not run the jobs itself, the owner updates it
+    with updateJobs and cancels the jobs on cancelRequested.
+    """
+
+    cancelRequested = pyqtSignal()
 
-    def __init__(self):
-        super(ProgressDialog, self).__init__()
+    def __init__(self, parent=None):
+        super(ProgressDialog, self).__init__(parent)
 
+        self.label: QLabel = None
         self.generatorProgress: QProgressBar = None
         self.messageProgress: QProgressBar = None
+        self.buttonBox: QDialogButtonBox = None
 
         uic.loadUi('GUI/Windows/progress.ui', self)
 
+        self.running: bool = False
+        self.buttonBox.rejected.connect(self.reject)
+
     def setCounts(self, generatorCount: int, messageCount: int):
-        self.generatorProgress.setMaximum(generatorCount)
-        self.messageProgress.setMaximum(messageCount)
+        """
+        :param generatorCount: number of running generators
+        :param messageCount: number of messages generated by all generators together
+        """
+        self.generatorProgress.setMaximum(max(1, generatorCount))
+        self.messageProgress.setMaximum(max(1, messageCount))
+        self.generatorProgress.setValue(0)
+        self.messageProgress.setValue(0)
+
+    def start(self, jobs: List[GenerationJob], messageCount: int):
+        """
+        Shows the dialog without blocking
+
+        :param jobs: the jobs to show the progress of
+        :param messageCount: number of messages each job generates
+        """
+        self.running = True
+        self.label.setText("Generating messages, please wait...")
+        self.buttonBox.setEnabled(True)
+        self.setCounts(len(jobs), len(jobs) * messageCount)
+        self.updateJobs(jobs)
+        self.open()
+
+    def updateJobs(self, jobs: List[GenerationJob]):
+        finished = [job for job in jobs if job.isDone]
+        running = [job.name for job in jobs if not job.isDone]
+
+        self.updateProgress(len(finished), ", ".join(running))
+        # totals are only known once a job started, until then the expected count set by setCounts is kept
+        total = sum(job.total for job in jobs)
+        if total > self.messageProgress.maximum():
+            self.messageProgress.setMaximum(total)
+        self.updateMessageProgress(sum(job.done for job in jobs))
 
     def updateProgress(self, generator: int, generatorName: str):
         self.generatorProgress.setFormat("Generating {} (%v / %m)".format(generatorName))
@@ -31,8 +69,19 @@ class ProgressDialog(QDialog):
         self.generatorProgress.setValue(generator)
 
     def updateMessageProgress(self, message: int):
+        self.messageProgress.setFormat("Message %v / %m")
         self.messageProgress.setValue(message)
 
+    def finish(self):
+        self.running = False
+        self.accept()
+
+    def reject(self):
+        # Closing the dialog while generating cancels, the dialog closes once all jobs stopped
+        if not self.running:
+            super(ProgressDialog, self).reject()
+            return
 
-    def runDialog(self):
-        self.exec()
+        self.label.setText("Cancelling, waiting for running generators to stop...")
+        self.buttonBox.setEnabled(False)
+        self.cancelRequested.emit()
@@ -18,7 +18,7 @@ class MessageModel(QStandardItemModel):
         root = self.invisibleRootItem()
 
         for message in messages:
-            full_name = ".".join([*message.package, message.name])
+            full_name = message.getID()
             if full_name in self.messageDB:
                 print("Ignored duplicate message: {}".format(full_name))
                 continue